@@ -0,0 +1,134 @@
+# backtest.py
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from projection import balance_paths
+from worker_pool import get_pool
+
+# Replays a strategy over historical closes (dates x tickers, e.g. from
+# history_store.get_close). Everything is computed over the whole date
+# range at once:
+#   lump_sum   invest `initial` on the first day at the target weights, hold
+#   dca        `initial` on the first day plus `monthly` on the first trading
+#              day of every month, each split by the target weights, hold
+#   rebalance  reset to the target weights at the start of every `rebalance`
+#              period ("M", "Q" or "Y"); contributions (`monthly` per month
+#              in the period) are added on those same days
+STRATEGIES = ("lump_sum", "dca", "rebalance")
+REBALANCE_MONTHS = {"M": 1, "Q": 3, "Y": 12}
+TRADING_DAYS = 252
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 1))
+
+
+@dataclass
+class BacktestResult:
+    equity: pd.Series
+    invested: pd.Series
+    drawdown: pd.Series
+    final_value: float
+    total_invested: float
+    cagr: float
+    volatility: float
+    max_drawdown: float
+
+    def metrics(self):
+        return {
+            "final_value": self.final_value,
+            "total_invested": self.total_invested,
+            "cagr": self.cagr,
+            "volatility": self.volatility,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+def _period_starts(index, freq):
+    # True on the first bar of each period, including the very first bar
+    periods = index.to_period(freq).asi8
+    starts = np.ones(len(index), dtype=bool)
+    starts[1:] = periods[1:] != periods[:-1]
+    return starts
+
+
+def _buy_and_hold(prices, weights, contributions):
+    units = np.cumsum(contributions[:, None] * weights / prices, axis=0)
+    return (units * prices).sum(axis=1)
+
+
+def _rebalanced(prices, weights, contributions, starts):
+    # Within a segment (between two rebalance days) the value follows the
+    # weighted price moves since the segment started. Segment end values
+    # chain like a balance with contributions, so projection.balance_paths
+    # gives them all at once.
+    start_rows = np.flatnonzero(starts)
+    segment = np.cumsum(starts) - 1
+    growth = (prices / prices[start_rows][segment]) @ weights
+    segment_growth = (prices[start_rows[1:]] / prices[start_rows[:-1]]) @ weights
+    first, added = contributions[0], contributions[start_rows[1:]]
+    each = added[0] if len(added) else 0.0
+    # end[k] = (end[k-1] + each) * segment_growth[k], starting from `first`
+    ends = balance_paths(segment_growth[None, :], each, first - each)[0]
+    values = np.concatenate([[first], ends + added])
+    return values[segment] * growth
+
+
+def run_backtest(close, weights, strategy="lump_sum", initial=10000.0, monthly=0.0, rebalance="Q"):
+    close = close.ffill().dropna()
+    if close.empty:
+        raise ValueError("No overlapping price history for these tickers")
+    prices = close.to_numpy(dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+
+    contributions = np.zeros(len(close))
+    if strategy == "rebalance":
+        starts = _period_starts(close.index, rebalance)
+        contributions[starts] = monthly * REBALANCE_MONTHS[rebalance]
+        contributions[0] = initial + monthly * REBALANCE_MONTHS[rebalance]
+        equity = _rebalanced(prices, weights, contributions, starts)
+    else:
+        if strategy == "dca":
+            contributions[_period_starts(close.index, "M")] = monthly
+        contributions[0] += initial
+        equity = _buy_and_hold(prices, weights, contributions)
+
+    # Time-weighted returns leave out the cash added each day, so CAGR,
+    # volatility and drawdown describe the strategy rather than the deposits
+    returns = (equity[1:] - contributions[1:]) / equity[:-1] - 1
+    index = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    drawdown = index / np.maximum.accumulate(index) - 1
+    years = (close.index[-1] - close.index[0]).days / 365.25
+    return BacktestResult(
+        equity=pd.Series(equity, index=close.index, name="equity"),
+        invested=pd.Series(np.cumsum(contributions), index=close.index, name="invested"),
+        drawdown=pd.Series(drawdown, index=close.index, name="drawdown"),
+        final_value=float(equity[-1]),
+        total_invested=float(contributions.sum()),
+        cagr=float(index[-1] ** (1 / years) - 1) if years > 0 else 0.0,
+        volatility=float(returns.std() * np.sqrt(TRADING_DAYS)) if len(returns) > 1 else 0.0,
+        max_drawdown=float(drawdown.min()),
+    )
+
+
+def _run_many(close, weights, param_sets):
+    return [run_backtest(close, weights, **params).metrics() for params in param_sets]
+
+
+def sweep(close, weights, param_sets):
+    # One backtest per dict of run_backtest keyword arguments. The sets are
+    # split into one batch per worker so the prices are only sent once each.
+    param_sets = list(param_sets)
+    workers = max(1, min(BACKTEST_WORKERS, len(param_sets)))
+    positions = [list(range(i, len(param_sets), workers)) for i in range(workers)]
+    batches = [[param_sets[p] for p in batch] for batch in positions]
+    if workers == 1:
+        results = [_run_many(close, weights, batches[0])]
+    else:
+        results = get_pool("backtest", BACKTEST_WORKERS).map(_run_many, [close] * workers, [weights] * workers, batches)
+    rows = [None] * len(param_sets)
+    for batch, metrics in zip(positions, results):
+        for position, row in zip(batch, metrics):
+            rows[position] = {**param_sets[position], **row}
+    return pd.DataFrame(rows)
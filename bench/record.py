@@ -0,0 +1,141 @@
+# bench/record.py
+# Records the upstream responses the benchmarks replay:
+#   python bench/record.py                 live, from Yahoo/Finnhub/OpenAI
+#   python bench/record.py --synthetic     deterministic stand-ins, offline
+# Everything goes to bench/fixtures/:
+#   prices.csv.gz       daily OHLCV bars (5 years) for SYMBOLS
+#   info.json           the Ticker.info fields the app reads, per symbol
+#   trending.html       Yahoo's trending tickers page
+#   rss.xml             one Yahoo headline feed (served for every symbol)
+#   finnhub_news.json   Finnhub general market news
+#   chat_reply.txt      one ZenBot completion
+# The live recording needs network access, plus FINNHUB_API_KEY and
+# OPENAI_API_KEY for those two fixtures (they keep their old file otherwise).
+import argparse
+import json
+import os
+import sys
+from email.utils import formatdate
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "bench", "fixtures")
+SYMBOLS = [
+    "AAPL", "MSFT", "NVDA", "GOOGL", "META", "AMZN", "TSLA", "PEP", "ICLN", "SPY",
+    "QQQ", "VOO", "JPM", "XOM", "KO", "DIS", "NFLX", "AMD", "BTC-USD", "ETH-USD",
+]
+INFO_FIELDS = ("shortName", "sector", "industry", "marketCap", "trailingPE", "dividendYield", "longBusinessSummary")
+HISTORY_PERIOD = "5y"
+CHAT_PROMPT = "What if I invest $200 a month for 10 years?"
+
+
+def _write(name, content):
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(os.path.join(FIXTURES, name), mode) as f:
+        f.write(content)
+
+
+def write_prices(data):
+    # Long format keeps the file small and easy to diff: date,symbol,OHLCV
+    frame = data.stack(level=1, future_stack=True).dropna(how="all")
+    frame.index.names = ["date", "symbol"]
+    frame.reset_index().to_csv(os.path.join(FIXTURES, "prices.csv.gz"), index=False, float_format="%.4f")
+
+
+def record_live():
+    import requests
+    import yfinance as yf
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+    write_prices(yf.download(SYMBOLS, period=HISTORY_PERIOD, group_by="column", auto_adjust=True, progress=False)
+                 [["Open", "High", "Low", "Close", "Volume"]])
+    info = {}
+    for symbol in SYMBOLS:
+        full = yf.Ticker(symbol).info
+        info[symbol] = {field: full[field] for field in INFO_FIELDS if full.get(field) is not None}
+    _write("info.json", json.dumps(info, indent=1))
+    _write("trending.html", requests.get("https://finance.yahoo.com/trending-tickers", headers=headers, timeout=10).content)
+    _write("rss.xml", requests.get("https://finance.yahoo.com/rss/headline?s=AAPL", headers=headers, timeout=10).content)
+
+    if os.getenv("FINNHUB_API_KEY"):
+        import finnhub
+
+        news = finnhub.Client(api_key=os.environ["FINNHUB_API_KEY"]).general_news("general", min_id=0)
+        _write("finnhub_news.json", json.dumps(news, indent=1))
+    if os.getenv("OPENAI_API_KEY"):
+        from openai import OpenAI
+
+        completion = OpenAI().chat.completions.create(model="gpt-4", messages=[{"role": "user", "content": CHAT_PROMPT}])
+        _write("chat_reply.txt", completion.choices[0].message.content)
+
+
+def record_synthetic(seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp("2025-06-30"), periods=5 * 252)
+    frames = {}
+    for i, symbol in enumerate(SYMBOLS):
+        close = (20 + 20 * i) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        frames[symbol] = pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.003, len(dates))),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1e5, 1e7, len(dates)),
+        }, index=dates)
+    write_prices(pd.concat(frames, axis=1).swaplevel(0, 1, axis=1))
+
+    sectors = ["Technology", "Consumer Cyclical", "Energy", "Financial Services", "Communication Services"]
+    info = {
+        symbol: {
+            "shortName": f"{symbol} Holdings",
+            "sector": sectors[i % len(sectors)],
+            "industry": "Synthetic",
+            "marketCap": int(1e9 * (i + 1)),
+            "trailingPE": round(10 + i * 1.5, 2),
+            "dividendYield": round(0.002 * (i % 5), 4),
+            "longBusinessSummary": f"{symbol} is a synthetic company used by the offline benchmarks.",
+        }
+        for i, symbol in enumerate(SYMBOLS)
+    }
+    _write("info.json", json.dumps(info, indent=1))
+
+    rows = "".join(f"<tr><td>{symbol}</td><td>{symbol} Holdings</td><td>100.00</td></tr>" for symbol in SYMBOLS[:10])
+    _write("trending.html", f"<html><body><table><thead><tr><th>Symbol</th><th>Name</th><th>Price</th></tr></thead>"
+                            f"<tbody>{rows}</tbody></table></body></html>")
+
+    now = int(dates[-1].timestamp())
+    items = "".join(
+        f"<item><guid>rss-{n}</guid><title>Headline {n}</title><link>https://example.com/rss/{n}</link>"
+        f"<description>Summary of article {n}.</description><pubDate>{formatdate(now - n * 3600, usegmt=True)}</pubDate></item>"
+        for n in range(1, 21)
+    )
+    _write("rss.xml", f'<?xml version="1.0"?><rss version="2.0"><channel><title>Headlines</title>{items}</channel></rss>')
+
+    news = [
+        {"id": 1000 + n, "datetime": now - n * 1800, "headline": f"Market headline {n}",
+         "summary": f"Summary of market article {n}.", "url": f"https://example.com/news/{n}"}
+        for n in range(1, 21)
+    ]
+    _write("finnhub_news.json", json.dumps(news, indent=1))
+
+    _write("chat_reply.txt", "Investing $200 a month for 10 years puts $24,000 to work. At a 7% average annual "
+                             "return that could grow to roughly $34,600, though markets rarely move in a straight line. "
+                             "Staying consistent through downturns matters more than timing the market.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the market-data fixtures replayed by the benchmarks")
+    parser.add_argument("--synthetic", action="store_true", help="write deterministic stand-ins without network access")
+    args = parser.parse_args()
+    os.makedirs(FIXTURES, exist_ok=True)
+    if args.synthetic:
+        record_synthetic()
+    else:
+        record_live()
+    print(f"Fixtures written to {FIXTURES}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
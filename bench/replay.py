@@ -0,0 +1,161 @@
+# bench/replay.py
+# Serves the recorded fixtures (see bench/record.py) in place of every
+# upstream the app talks to, and counts the calls that would have gone out:
+#   yfinance.download / yfinance.Ticker(...).info
+#   HTTP through requests (trending page, RSS headlines, Finnhub news)
+#   the OpenAI client handed out by clients.py
+# Recorded bars are shifted so the last one falls on today. Symbols that
+# weren't recorded reuse a recorded series (picked by a stable hash of the
+# symbol), so portfolios of any size can be replayed. Anything else raises
+# a ConnectionError, as it would offline.
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+PERIODS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "7d": pd.DateOffset(days=7),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+}
+
+
+def _read(fixtures, name, mode="r"):
+    with open(os.path.join(fixtures, name), mode) as f:
+        return f.read()
+
+
+class Replay:
+    def __init__(self, fixtures=FIXTURES):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        prices = pd.read_csv(os.path.join(fixtures, "prices.csv.gz"), parse_dates=["date"])
+        shift = pd.Timestamp.today().normalize() - prices["date"].max()
+        prices["date"] += shift
+        self.bars = {symbol: frame.set_index("date")[FIELDS] for symbol, frame in prices.groupby("symbol")}
+        self.recorded = sorted(self.bars)
+        self.info = json.loads(_read(fixtures, "info.json"))
+        self.trending = _read(fixtures, "trending.html", "rb")
+        self.rss = _read(fixtures, "rss.xml", "rb")
+        self.news = json.loads(_read(fixtures, "finnhub_news.json"))
+        self.chat_reply = _read(fixtures, "chat_reply.txt")
+
+    def count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return Counter(self.calls)
+
+    def source(self, symbol):
+        if symbol in self.bars:
+            return symbol
+        return self.recorded[zlib.crc32(symbol.encode()) % len(self.recorded)]
+
+    def bars_for(self, symbol, period=None, start=None):
+        frame = self.bars[self.source(symbol)]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        elif period in PERIODS:
+            frame = frame[frame.index > frame.index[-1] - PERIODS[period]]
+        return frame
+
+    # yfinance
+
+    def download(self, tickers, period="1mo", start=None, **kwargs):
+        self.count("yahoo.download")
+        symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {symbol: self.bars_for(symbol, period, start) for symbol in symbols}
+        data = pd.concat(frames, axis=1).swaplevel(0, 1, axis=1)
+        return data.reindex(columns=pd.MultiIndex.from_product([FIELDS, symbols]))
+
+    def ticker(self, symbol):
+        replay = self
+
+        class Ticker:
+            @property
+            def info(self):
+                replay.count("yahoo.info")
+                if symbol in replay.info:
+                    return dict(replay.info[symbol])
+                return dict(replay.info[replay.source(symbol)], shortName=f"{symbol} Holdings")
+
+        return Ticker()
+
+    # HTTP
+
+    def _response(self, url, status, body=b"", headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers.update(headers or {})
+        return response
+
+    def request(self, session, method, url, headers=None, params=None, **kwargs):
+        parsed = urlparse(url)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        query.update(params or {})
+        headers = {**session.headers, **(headers or {})}
+        if "trending" in parsed.path:
+            self.count("yahoo.trending")
+            return self._response(url, 200, self.trending)
+        if "/rss/" in parsed.path:
+            self.count("yahoo.rss")
+            etag = '"' + hashlib.sha1(self.rss).hexdigest() + '"'
+            if headers.get("If-None-Match") == etag:
+                return self._response(url, 304, headers={"ETag": etag})
+            return self._response(url, 200, self.rss, {"ETag": etag})
+        if parsed.path.endswith("/news"):
+            self.count("finnhub.news")
+            min_id = int(query.get("minId", 0))
+            body = json.dumps([item for item in self.news if item["id"] > min_id]).encode()
+            return self._response(url, 200, body, {"Content-Type": "application/json"})
+        raise requests.ConnectionError(f"No fixture for {method} {url}")
+
+    # OpenAI
+
+    def openai_client(self):
+        replay = self
+
+        def create(stream=False, **kwargs):
+            replay.count("openai.chat")
+            words = replay.chat_reply.split(" ")
+            chunks = [" ".join(words[i:i + 8]) + (" " if i + 8 < len(words) else "") for i in range(0, len(words), 8)]
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+                for chunk in chunks
+            )
+
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    def install(self):
+        # Patches the libraries in place, so it works whether the app
+        # modules were imported before or after
+        import yfinance
+
+        import clients
+
+        yfinance.download = self.download
+        yfinance.Ticker = self.ticker
+        replay = self
+        requests.Session.request = lambda session, method, url, **kwargs: replay.request(session, method, url, **kwargs)
+        clients._openai_client = self.openai_client
+        return self
@@ -0,0 +1,261 @@
+# bench/run.py
+# Offline benchmarks of full Streamlit reruns, replaying bench/fixtures:
+#   python bench/run.py                                  the whole matrix
+#   python bench/run.py --pages main --positions 20 --trades 1000
+#   python bench/run.py --json results.json              save the results
+#   python bench/run.py --baseline results.json          exit 1 on a regression
+# Each (page, positions, trades) case runs in a fresh process with empty
+# caches and a temporary data directory, seeded with an account holding
+# `positions` assets built up from `trades` transactions. Per case:
+#   cold_ms      first run (empty caches, account loaded from SQLite)
+#   rerun_ms     median of the following reruns
+#   calls        upstream calls that would have gone out, cold + reruns
+#   peak_mb      peak Python allocations during one more rerun (tracemalloc)
+#   rss_mb       peak resident memory of the whole process
+# Cases with fewer trades than positions can't exist and are skipped.
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    "main": "mock_investment_account.py",
+    "sidebar": None,
+    "asset": "pages/asset_dashboard.py",
+    "what_if": "pages/what_if_simulator.py",
+}
+DEFAULT_PAGES = ["main", "sidebar", "asset"]
+DEFAULT_POSITIONS = [1, 20, 200]
+DEFAULT_TRADES = [10, 1000, 100000]
+RERUNS = 5
+RUN_TIMEOUT_SECONDS = 600
+# Background price polling would make call counts depend on timing
+QUIET_POLL_SECONDS = "86400"
+SEED = 42
+BENCH_ACCOUNT = "bench"
+# Part of the starting cash goes into the initial positions; later trades
+# are small round trips, so the cash balance stays within what the page
+# can display
+INITIAL_INVESTMENT = 50000
+ROUND_TRIP_DOLLARS = 100
+# Relative slack before a slower or bigger result counts as a regression
+TOLERANCE = 0.25
+TIMED_METRICS = ("cold_ms", "rerun_ms", "peak_mb")
+
+
+def portfolio_symbols(replay, positions):
+    # Recorded symbols first, then NASDAQ listings (replayed on recorded bars)
+    import pandas as pd
+
+    listed = pd.read_csv(os.path.join(ROOT, "nasdaq-listed-symbols.csv"))
+    listed = listed.loc[listed["Test Issue"] == "N", "Symbol"].dropna()
+    symbols = list(dict.fromkeys(replay.recorded + [s for s in listed if s.isalpha()]))
+    return symbols[:positions]
+
+
+def build_account(replay, positions, trades):
+    # Deterministic history: one opening buy per position, then small buys
+    # that are later sold again at the price of the day
+    import numpy as np
+    import pandas as pd
+
+    from storage import apply_event, new_state
+
+    rng = np.random.default_rng(SEED)
+    symbols = portfolio_symbols(replay, positions)
+    closes = {symbol: replay.bars_for(symbol)["Close"] for symbol in symbols}
+    end = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    dates = pd.date_range(end - pd.DateOffset(years=4), end, periods=trades)
+    picks = rng.integers(0, positions, trades)
+
+    state = new_state()
+    lots = []
+    for i, date in enumerate(dates):
+        if i < positions:
+            symbol, action = symbols[i], "Buy"
+        elif lots and i % 2:
+            symbol, shares = lots.pop(rng.integers(len(lots)))
+            action = "Sell"
+        else:
+            symbol, action = symbols[picks[i]], "Buy"
+        close = closes[symbol]
+        price = float(close.iloc[max(0, close.index.searchsorted(date) - 1)])
+        if action == "Buy":
+            budget = INITIAL_INVESTMENT / positions if i < positions else ROUND_TRIP_DOLLARS
+            shares = round(budget / price, 6)
+            if i >= positions:
+                lots.append((symbol, shares))
+        apply_event(state, "txn", {
+            "date": date.to_pydatetime(),
+            "action": action,
+            "asset": symbol,
+            "shares": shares,
+            "price": price,
+            "total": shares * price,
+        })
+    return state, symbols
+
+
+def sidebar_page():
+    import sidebar
+
+    sidebar.render_sidebar()
+
+
+def run_case(page, positions, trades, reruns):
+    # Runs in the worker process: everything the app writes goes to a
+    # temporary directory, and every upstream is replayed
+    data = tempfile.mkdtemp(prefix="bench-")
+    os.environ.update({
+        "ACCOUNTS_DB": os.path.join(data, "accounts.db"),
+        "FUNDAMENTALS_DB": os.path.join(data, "fundamentals.db"),
+        "HISTORY_DIR": os.path.join(data, "history"),
+        "PRICE_POLL_SECONDS": QUIET_POLL_SECONDS,
+        "PRICE_CLOSED_POLL_SECONDS": QUIET_POLL_SECONDS,
+        "QUOTE_FEED": "",
+    })
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from streamlit.testing.v1 import AppTest
+
+    from replay import Replay
+    from storage import AccountStore
+
+    replay = Replay().install()
+    state, symbols = build_account(replay, positions, trades)
+    AccountStore().import_state(BENCH_ACCOUNT, state)
+
+    if PAGES[page] is None:
+        app = AppTest.from_function(sidebar_page, default_timeout=RUN_TIMEOUT_SECONDS)
+    else:
+        app = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=RUN_TIMEOUT_SECONDS)
+    app.query_params["account"] = BENCH_ACCOUNT
+    if page == "asset":
+        app.query_params["ticker"] = symbols[0]
+
+    def timed_run():
+        started = time.perf_counter()
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+        return (time.perf_counter() - started) * 1000
+
+    cold_ms = timed_run()
+    cold_calls = replay.snapshot()
+    rerun_ms = statistics.median(timed_run() for _ in range(reruns))
+    rerun_calls = replay.snapshot() - cold_calls
+    tracemalloc.start()
+    timed_run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "page": page,
+        "positions": positions,
+        "trades": trades,
+        "cold_ms": round(cold_ms, 1),
+        "rerun_ms": round(rerun_ms, 1),
+        "cold_calls": dict(cold_calls),
+        "rerun_calls": dict(rerun_calls),
+        "peak_mb": round(peak / 2**20, 2),
+        "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def spawn(page, positions, trades, reruns):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", page, str(positions), str(trades), "--reruns", str(reruns)]
+    result = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        error = (result.stderr.strip().splitlines() or ["worker failed"])[-1]
+        return {"page": page, "positions": positions, "trades": trades, "error": error}
+    return json.loads(lines[-1])
+
+
+def total_calls(result):
+    return sum(result["cold_calls"].values()) + sum(result["rerun_calls"].values())
+
+
+def format_calls(calls):
+    return " ".join(f"{name}={count}" for name, count in sorted(calls.items())) or "-"
+
+
+def report(result):
+    case = f"{result['page']:<8} {result['positions']:>4} pos {result['trades']:>6} trades"
+    if "error" in result:
+        return f"{case}  ERROR {result['error']}"
+    return (
+        f"{case}  cold {result['cold_ms']:>8.1f} ms  rerun {result['rerun_ms']:>8.1f} ms  "
+        f"peak {result['peak_mb']:>7.2f} MB  rss {result['rss_mb']:>6.1f} MB\n"
+        f"{'':<32}cold calls: {format_calls(result['cold_calls'])}  rerun calls: {format_calls(result['rerun_calls'])}"
+    )
+
+
+def regressions(results, baseline, tolerance):
+    # Slower or bigger by more than the tolerance, or any extra upstream call
+    previous = {(r["page"], r["positions"], r["trades"]): r for r in baseline if "error" not in r}
+    found = []
+    for result in results:
+        before = previous.get((result["page"], result["positions"], result["trades"]))
+        if before is None or "error" in result:
+            continue
+        case = f"{result['page']} {result['positions']} pos {result['trades']} trades"
+        for metric in TIMED_METRICS:
+            if result[metric] > before[metric] * (1 + tolerance):
+                found.append(f"{case}: {metric} {before[metric]} -> {result[metric]}")
+        if total_calls(result) > total_calls(before):
+            found.append(f"{case}: upstream calls {total_calls(before)} -> {total_calls(result)}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page reruns against recorded market data")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=DEFAULT_PAGES)
+    parser.add_argument("--positions", nargs="+", type=int, default=DEFAULT_POSITIONS)
+    parser.add_argument("--trades", nargs="+", type=int, default=DEFAULT_TRADES)
+    parser.add_argument("--reruns", type=int, default=RERUNS)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--worker", nargs=3, metavar=("PAGE", "POSITIONS", "TRADES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        page, positions, trades = args.worker
+        print(json.dumps(run_case(page, int(positions), int(trades), args.reruns)))
+        return
+
+    print(f"Benchmark run {datetime.now():%Y-%m-%d %H:%M}, Python {sys.version.split()[0]}")
+    results = []
+    for positions in args.positions:
+        for trades in args.trades:
+            if trades < positions:
+                continue
+            for page in args.pages:
+                result = spawn(page, positions, trades, args.reruns)
+                print(report(result), flush=True)
+                results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    failed = any("error" in result for result in results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        failed |= bool(found)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
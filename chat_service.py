@@ -0,0 +1,111 @@
+# chat_service.py
+import hashlib
+import os
+import re
+
+from clients import get_openai_client
+from market_cache import cache
+from upstream import get_upstream
+
+# ZenBot completions. Replies are streamed as they are generated and cached
+# process-wide by normalized prompt, so the canned follow-up questions (and
+# anyone asking the same thing) are answered without an API call. Older
+# turns beyond the token budget are folded into a short extractive summary.
+# Point OPENAI_BASE_URL at tools/stub_openai.py to run without the real API.
+CHAT_MODEL = os.getenv("ZENBOT_MODEL", "gpt-4")
+CHAT_TEMPERATURE = 0.7
+RESPONSE_TTL_SECONDS = 24 * 3600
+HISTORY_TOKEN_BUDGET = int(os.getenv("ZENBOT_HISTORY_TOKENS", 1500))
+SUMMARY_TOKEN_BUDGET = 200
+# Rough size of a token in characters; close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def normalize_prompt(text):
+    # "What if I invest $200/month?" and "what if i invest 200 / month" match
+    text = text.lower().replace("%", " percent ")
+    text = re.sub(r"[^a-z0-9.]+", " ", text)
+    text = re.sub(r"(?<![0-9])\.|\.(?![0-9])", " ", text)
+    return " ".join(text.split())
+
+
+def cache_key(prompt, history, context_free=False):
+    # Standalone questions (like the suggested follow-ups) are cached on the
+    # prompt alone; anything else also depends on the user's last question
+    key = normalize_prompt(prompt)
+    if not context_free:
+        previous = [m["content"] for m in history if m["role"] == "user"]
+        key += "\n" + (normalize_prompt(previous[-1]) if previous else "")
+    return ("chat", CHAT_MODEL, hashlib.sha256(key.encode()).hexdigest())
+
+
+def _first_sentence(text):
+    return re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+
+
+def summarize(messages, budget=SUMMARY_TOKEN_BUDGET):
+    # Extractive: the first sentence of each dropped turn, newest kept first
+    # if it doesn't all fit
+    lines = []
+    used = 0
+    for message in reversed(messages):
+        speaker = "User" if message["role"] == "user" else "ZenBot"
+        line = f"{speaker}: {_first_sentence(message['content'])}"
+        used += estimate_tokens(line)
+        if used > budget:
+            break
+        lines.append(line)
+    return "Summary of the earlier conversation:\n" + "\n".join(reversed(lines))
+
+
+def truncate_history(history, budget=HISTORY_TOKEN_BUDGET):
+    # Keeps the most recent turns that fit the budget and summarizes the rest
+    kept = []
+    used = 0
+    for message in reversed(history):
+        used += estimate_tokens(message["content"])
+        if used > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+    dropped = history[:len(history) - len(kept)]
+    if dropped:
+        return [{"role": "system", "content": summarize(dropped)}] + kept
+    return kept
+
+
+def build_messages(system_msg, history, prompt):
+    # Only role/content go to the API, whatever else the session stores
+    history = [{"role": m["role"], "content": m["content"]} for m in history]
+    return [system_msg] + truncate_history(history) + [{"role": "user", "content": prompt}]
+
+
+def _stream_completion(messages):
+    stream = get_upstream("openai").call(
+        get_openai_client().chat.completions.create,
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=CHAT_TEMPERATURE,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def stream_reply(system_msg, history, prompt, context_free=False):
+    # Yields the reply in pieces (for st.write_stream). A cached reply is
+    # yielded whole; a fresh one is cached once it has fully arrived.
+    key = cache_key(prompt, history, context_free)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    for part in _stream_completion(build_messages(system_msg, history, prompt)):
+        parts.append(part)
+        yield part
+    cache.set(key, "".join(parts), ttl=RESPONSE_TTL_SECONDS)
@@ -0,0 +1,50 @@
+# clients.py
+import os
+import threading
+
+from upstream import get_upstream
+
+# API clients shared by every session, created on first use. The SDKs are
+# imported here, inside the getters, so loading a page doesn't pay for
+# finnhub or openai until something actually calls them.
+FINNHUB_API_URL = os.getenv("FINNHUB_API_URL", "https://api.finnhub.io/api/v1")
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "d1vsb5pr01qmbi8pt1cgd1vsb5pr01qmbi8pt1d0")
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get(name, create):
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = create()
+        return client
+
+
+def _finnhub_client():
+    import finnhub
+
+    client = finnhub.Client(api_key=FINNHUB_API_KEY)
+    client.API_URL = FINNHUB_API_URL
+    return client
+
+
+def _openai_client():
+    from openai import OpenAI
+
+    # Retries and timeouts are handled by the upstream layer
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL"),
+        timeout=get_upstream("openai").timeout,
+        max_retries=0,
+    )
+
+
+def get_finnhub_client():
+    return _get("finnhub", _finnhub_client)
+
+
+def get_openai_client():
+    return _get("openai", _openai_client)
@@ -0,0 +1,121 @@
+# fundamentals.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from market_cache import cache
+from upstream import Backoff, UpstreamError, get_upstream
+
+# Only these .info fields are kept. They are refreshed once per (UTC) day
+# and stored in SQLite, so restarts don't refetch them.
+FIELDS = (
+    "shortName",
+    "sector",
+    "industry",
+    "marketCap",
+    "trailingPE",
+    "dividendYield",
+    "longBusinessSummary",
+)
+DB_PATH = os.getenv("FUNDAMENTALS_DB", os.path.join("data", "fundamentals.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+def fetch_fundamentals(symbol):
+    import yfinance as yf
+
+    info = get_upstream("yahoo").call(lambda: yf.Ticker(symbol).info)
+    return {field: info.get(field) for field in FIELDS if info.get(field) is not None}
+
+
+class FundamentalsStore:
+    def __init__(self, path=DB_PATH, fetch=fetch_fundamentals):
+        self.path = path
+        self.fetch = fetch
+        self._local = threading.local()
+        self._rows = {}
+        self._backoff = Backoff()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _stored(self, symbol):
+        if symbol not in self._rows:
+            row = self._conn().execute(
+                "SELECT fetched_at, data FROM fundamentals WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            self._rows[symbol] = (row[0], json.loads(row[1])) if row else None
+        return self._rows[symbol]
+
+    def _refresh(self, symbol):
+        data = self.fetch(symbol)
+        fetched_at = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fundamentals (symbol, fetched_at, data) VALUES (?, ?, ?)",
+                (symbol, fetched_at, json.dumps(data)),
+            )
+        self._rows[symbol] = (fetched_at, data)
+        return data
+
+    def get(self, symbol):
+        stored = self._stored(symbol)
+        if stored and _day(stored[0]) == _day(time.time()):
+            return stored[1]
+        # After a failed refresh the symbol isn't asked for again until its
+        # backoff has passed
+        wait = self._backoff.remaining(symbol)
+        if not wait:
+            try:
+                # Sessions asking for the same symbol share one refresh
+                data = cache.coalesce(("fundamentals", symbol), lambda: self._refresh(symbol))
+            except Exception:
+                self._backoff.record_failure(symbol)
+                wait = self._backoff.remaining(symbol)
+            else:
+                self._backoff.record_success(symbol)
+                return data
+        # Serve yesterday's data rather than nothing
+        if stored:
+            return stored[1]
+        raise UpstreamError(f"No fundamentals for {symbol}, retrying in {wait:.0f}s")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FundamentalsStore()
+        return _store
+
+
+def get_fundamentals(symbol):
+    return get_store().get(symbol)
@@ -1,124 +1,73 @@
-import os
+import uuid
 
 import pandas as pd
 
-def get_transactions_for_asset(ticker):
-    import streamlit as st
-
-    # Ensure history exists in session
-    if 'history' not in st.session_state:
-        return pd.DataFrame()
-
-    # Filter transactions for the specific asset
-    data = [txn for txn in st.session_state.history if txn["asset"] == ticker]
-    if not data:
-        return pd.DataFrame()
-
-    return pd.DataFrame(data)
-
-def generate_asset_page(user_ticker):
-    from streamlit_autorefresh import st_autorefresh
-    directory = "pages"
-    os.makedirs(directory, exist_ok=True)
-    page_path = os.path.join(directory, f"{user_ticker}.py")
-    if os.path.exists(page_path):
-        return
-    
-    content = f'''
-import streamlit as st
-import yfinance as yf
-import plotly.express as px
-import pandas as pd
-from datetime import datetime
-import feedparser
-from streamlit_autorefresh import st_autorefresh
-from helpers import get_transactions_for_asset
-from sidebar import render_sidebar
-
-render_sidebar()
-
-ticker = "{user_ticker}"
-st_autorefresh(interval=60000, key="refresh_{user_ticker}")
-
-st.title("📉 " + ticker + " – Asset Dashboard")
+from ledger import Ledger
+from storage import apply_event, get_store, load_account
 
-info = yf.Ticker(ticker).info
-price_data = yf.Ticker(ticker).history(period="1d")
-price = price_data["Close"].iloc[-1] if not price_data.empty else None
-
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.subheader("🏢 Company Info")
-    st.markdown(f"**Name:** {{info.get('shortName', 'N/A')}}")
-    st.markdown(f"**Industry:** {{info.get('industry', 'N/A')}}")
-    st.markdown(f"**Sector:** {{info.get('sector', 'N/A')}}")
-
-with col2:
-    st.subheader("💰 Live Price")
-    if price:
-        st.metric(label=f"{{ticker}} Price", value=f"${{price:,.2f}}")
-    else:
-        st.write("N/A")
+def init_account_state():
+    import streamlit as st
 
-with col3:
-    st.subheader("📊 Key Financials")
-    market_cap = info.get('marketCap')
-    pe_ratio = info.get('trailingPE')
-    dividend_yield = info.get('dividendYield')
+    # Every session gets its own account unless ?account= names one; the id
+    # goes into the URL so a reload or a shared link reopens the same account
+    if 'account_id' not in st.session_state:
+        account = st.query_params.get("account") or uuid.uuid4().hex[:12]
+        for key, value in load_account(account).items():
+            st.session_state[key] = value
+        st.session_state.account_id = account
+    # Page links replace the whole query string, so the id is put back on
+    # every run rather than only when the account is first loaded
+    if st.query_params.get("account") != st.session_state.account_id:
+        st.query_params["account"] = st.session_state.account_id
+
+def record_event(kind, payload):
+    import streamlit as st
 
-    st.metric(label="Market Cap", value=f"${{market_cap:,}}" if market_cap else "N/A", help="The total value of all a company's shares of stock.")
-    st.metric(label="P/E Ratio", value=f"{{pe_ratio:.2f}}" if pe_ratio else "N/A", help="Price-to-Earnings ratio: shows how much investors are willing to pay per dollar of earnings.")
-    st.metric(label="Dividend Yield", value=f"{{dividend_yield * 100:.2f}}%" if dividend_yield else "N/A", help="How much a company returns to shareholders as dividends, annually as a % of stock price.")
+    # Apply to the session, then journal it as a single small append
+    apply_event(st.session_state, kind, payload)
+    if kind == "txn":
+        st.session_state.portfolio_version = st.session_state.get("portfolio_version", 0) + 1
+    get_store().append(st.session_state.account_id, kind, payload)
 
-st.header("📊 Price Trend")
-timeframe = st.radio("Select timeframe:", ["7 Days", "1 Month", "1 Year"], horizontal=True)
-period_map = {{
-    "7 Days": "7d",
-    "1 Month": "1mo",
-    "1 Year": "1y"
-}}
-period = period_map[timeframe]
+def record_transaction(txn):
+    record_event("txn", txn)
 
-try:
-    df = yf.Ticker(ticker).history(period=period)
-    fig = px.line(df, x=df.index, y="Close", title=ticker + " - Price Trend (" + timeframe + ")")
-    st.plotly_chart(fig)
-except Exception as e:
-    st.warning("Error loading chart: " + str(e))
+def cached_section(name, key, compute):
+    import streamlit as st
 
-st.header("🧾 Your Transactions for This Asset")
-txns = get_transactions_for_asset(ticker)
+    # Reuse a section's last result while its key (e.g. portfolio and price
+    # versions) is unchanged
+    sections = st.session_state.setdefault("section_cache", {})
+    entry = sections.get(name)
+    if entry is None or entry[0] != key:
+        entry = (key, compute())
+        sections[name] = entry
+    return entry[1]
 
-if not txns.empty:
-    total_cost = (txns['price'] * txns['shares']).sum()
-    total_shares = txns['shares'].sum()
-    avg_buy_price = total_cost / total_shares if total_shares else 0
-    gain = ((price - avg_buy_price) / avg_buy_price) * 100 if avg_buy_price else 0
-    st.metric("📈 Unrealized Return", f"{{gain:.2f}}%", delta=f"${{price - avg_buy_price:.2f}}", help="Your % return if you sold at the current price vs. what you paid.")
-else:
-    st.info("No transactions for this asset yet.")
+def get_ledger():
+    import streamlit as st
 
-if not txns.empty:
-    st.dataframe(txns)
+    history = st.session_state.get('history', [])
+    ledger = st.session_state.get('ledger')
+    # Rebuild if the history was replaced, otherwise only record new entries
+    if ledger is None or ledger.count > len(history):
+        ledger = Ledger.from_history(history)
+        st.session_state.ledger = ledger
+        return ledger
+    for txn in history[ledger.count:]:
+        ledger.record(txn)
+    return ledger
 
-st.header("📰 Latest News on " + ticker)
-try:
-    rss = feedparser.parse(f"https://finance.yahoo.com/rss/headline?s={{ticker}}")
-    if rss.entries:
-        for entry in rss.entries[:5]:
-            st.markdown(f"- [{{entry.title}}]({{entry.link}})")
-    else:
-        st.info("No news articles found.")
-except Exception as e:
-    st.warning("Error fetching news: " + str(e))
-'''
+def get_transactions_for_asset(ticker):
+    import streamlit as st
 
+    # Ensure history exists in session
+    if 'history' not in st.session_state:
+        return pd.DataFrame()
 
+    # Look up this asset's transactions through the ledger index
+    data = get_ledger().transactions(ticker, st.session_state.history)
+    if not data:
+        return pd.DataFrame()
 
-    try:
-        with open(page_path, "w") as f:
-            f.write(content)
-        print(f"✅ Successfully generated: {page_path}")
-    except Exception as e:
-        print(f"❌ Failed to write page for {user_ticker}: {e}")
+    return pd.DataFrame(data)
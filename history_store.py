@@ -0,0 +1,143 @@
+# history_store.py
+import os
+import threading
+import time
+
+import pandas as pd
+
+from quote_service import download
+
+# Daily OHLCV bars are kept on disk, one Parquet file per symbol. Only the
+# bars after the last stored one are fetched; every period is sliced locally.
+HISTORY_DIR = os.getenv("HISTORY_DIR", os.path.join("data", "history"))
+BACKFILL_PERIOD = "5y"
+# How often (seconds) a stored symbol is checked upstream for new bars
+SYNC_INTERVAL_SECONDS = 15 * 60
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "7d": pd.DateOffset(days=7),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "max": None,
+}
+
+_frames = {}
+_synced_at = {}
+_fetching = {}
+_lock = threading.Lock()
+
+
+def _path(symbol):
+    return os.path.join(HISTORY_DIR, symbol.replace("/", "_") + ".parquet")
+
+
+def _empty():
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def _load(symbol):
+    if symbol not in _frames:
+        path = _path(symbol)
+        _frames[symbol] = pd.read_parquet(path) if os.path.exists(path) else _empty()
+    return _frames[symbol]
+
+
+def _save(symbol, frame):
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    path = _path(symbol)
+    frame.to_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    _frames[symbol] = frame
+
+
+def _normalize(frame):
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = frame.reindex(columns=COLUMNS).astype(float)
+    frame.index = index.normalize().rename("Date")
+    return frame.dropna(how="all")
+
+
+def _merge(symbol, data):
+    if symbol not in data.columns.get_level_values(1):
+        return
+    new = _normalize(data.xs(symbol, axis=1, level=1))
+    if new.empty:
+        return
+    # The last stored bar is refetched too, since it may have been a partial day
+    frame = pd.concat([_load(symbol), new])
+    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+    _save(symbol, frame)
+
+
+def sync(symbols):
+    # The lock only guards the stored frames and bookkeeping; downloads run
+    # outside it, so reads of other symbols never wait on the network. A
+    # symbol already being fetched by another session is waited on instead
+    # of fetched twice.
+    with _lock:
+        now = time.time()
+        symbols = list(dict.fromkeys(symbols))
+        pending = {_fetching[s] for s in symbols if s in _fetching}
+        due = [s for s in symbols if s not in _fetching and now - _synced_at.get(s, 0) >= SYNC_INTERVAL_SECONDS]
+        # One batch per start date, so each symbol is only refetched from its
+        # own last bar; symbols with nothing stored are backfilled together
+        batches = {}
+        for symbol in due:
+            frame = _load(symbol)
+            start = None if frame.empty else frame.index[-1].strftime("%Y-%m-%d")
+            batches.setdefault(start, []).append(symbol)
+        done = threading.Event()
+        for symbol in due:
+            _fetching[symbol] = done
+
+    try:
+        for start, batch in batches.items():
+            kwargs = {"period": BACKFILL_PERIOD} if start is None else {"start": start}
+            try:
+                data = download(batch, interval="1d", **kwargs)
+            except Exception:
+                # Keep serving whatever is stored; retry after the next interval
+                data = pd.DataFrame()
+            with _lock:
+                for symbol in batch:
+                    _synced_at[symbol] = now
+                    if not data.empty:
+                        _merge(symbol, data)
+    finally:
+        with _lock:
+            for symbol in due:
+                del _fetching[symbol]
+        done.set()
+
+    for event in pending:
+        event.wait()
+
+
+def _slice(frame, period):
+    offset = PERIOD_OFFSETS.get(period)
+    if frame.empty or offset is None:
+        return frame
+    # Windows are anchored on the last stored bar so charts keep working
+    # while upstream is unavailable
+    return frame[frame.index > frame.index[-1] - offset]
+
+
+def get_history(symbol, period="1y"):
+    sync([symbol])
+    return _slice(_load(symbol), period)
+
+
+def get_close(symbols, period="1y"):
+    symbols = list(dict.fromkeys(symbols))
+    sync(symbols)
+    close = pd.concat({s: _load(s)["Close"] for s in symbols}, axis=1)
+    return _slice(close, period).reindex(columns=symbols)
@@ -0,0 +1,102 @@
+# holdings_engine.py
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Risk buckets used by the risk indicator
+RISK_BUCKETS = ["Standard", "Volatile"]
+VOLATILE_ASSETS = {"BTC-USD", "ETH-USD"}
+
+
+@dataclass
+class Valuation:
+    symbols: np.ndarray
+    shares: np.ndarray
+    prices: np.ndarray
+    priced: np.ndarray
+    market_values: np.ndarray
+    weights: np.ndarray
+    unrealized_pnl: np.ndarray
+    themes: list
+    theme_totals: np.ndarray
+    theme_priced: np.ndarray
+    risk_ratios: np.ndarray
+    total: float
+
+    def positions_frame(self):
+        p = self.priced
+        return pd.DataFrame({
+            "Asset": self.symbols[p],
+            "Shares": self.shares[p],
+            "Current Price": self.prices[p],
+            "Value": self.market_values[p],
+            "Weight": self.weights[p],
+            "Unrealized P&L": self.unrealized_pnl[p],
+        })
+
+    def theme_frame(self):
+        p = self.theme_priced
+        return pd.DataFrame({
+            "Theme": np.array(self.themes, dtype=object)[p],
+            "Total Value": self.theme_totals[p],
+        })
+
+    def risk_ratio(self, bucket):
+        return self.risk_ratios[RISK_BUCKETS.index(bucket)]
+
+
+# Positions as aligned arrays: symbol, shares, cost basis, theme id and
+# risk bucket id. Valuation is a single vectorized pass over a price vector.
+class Holdings:
+    def __init__(self, symbols, shares, cost_basis, theme_ids, themes, risk_ids):
+        self.symbols = symbols
+        self.shares = shares
+        self.cost_basis = cost_basis
+        self.theme_ids = theme_ids
+        self.themes = themes
+        self.risk_ids = risk_ids
+
+    @classmethod
+    def from_portfolio(cls, portfolio, theme_map, cost_basis=None):
+        cost_basis = cost_basis or {}
+        symbols = np.array(list(portfolio), dtype=object)
+        themes = list(dict.fromkeys(theme_map.get(s, "Other") for s in symbols))
+        theme_index = {theme: i for i, theme in enumerate(themes)}
+        return cls(
+            symbols=symbols,
+            shares=np.fromiter(portfolio.values(), dtype=float, count=len(symbols)),
+            cost_basis=np.array([cost_basis.get(s, np.nan) for s in symbols], dtype=float),
+            theme_ids=np.array([theme_index[theme_map.get(s, "Other")] for s in symbols], dtype=np.intp),
+            themes=themes,
+            risk_ids=np.array([s in VOLATILE_ASSETS for s in symbols], dtype=np.intp),
+        )
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def price_vector(self, prices):
+        return np.array([np.nan if prices.get(s) is None else prices[s] for s in self.symbols], dtype=float)
+
+    def value(self, prices):
+        price = prices if isinstance(prices, np.ndarray) else self.price_vector(prices)
+        priced = ~np.isnan(price)
+        market_values = np.where(priced, self.shares * price, 0.0)
+        total = market_values.sum()
+        weights = market_values / total if total else np.zeros_like(market_values)
+        n_themes = len(self.themes)
+        risk_totals = np.bincount(self.risk_ids, weights=market_values, minlength=len(RISK_BUCKETS))
+        return Valuation(
+            symbols=self.symbols,
+            shares=self.shares,
+            prices=price,
+            priced=priced,
+            market_values=market_values,
+            weights=weights,
+            unrealized_pnl=np.where(priced, market_values - self.cost_basis, np.nan),
+            themes=self.themes,
+            theme_totals=np.bincount(self.theme_ids, weights=market_values, minlength=n_themes),
+            theme_priced=np.bincount(self.theme_ids, weights=priced, minlength=n_themes) > 0,
+            risk_ratios=risk_totals / total if total else np.zeros(len(RISK_BUCKETS)),
+            total=float(total),
+        )
@@ -0,0 +1,86 @@
+# ledger.py
+from collections import deque
+
+COST_METHODS = ("average", "fifo")
+
+
+# Running aggregates for one asset, plus the indices of its transactions
+# in the history list
+class Position:
+    def __init__(self):
+        self.shares = 0.0
+        self.cost_basis = 0.0
+        self.realized_pnl = 0.0
+        self.txn_ids = []
+        self.lots = deque()
+
+    @property
+    def average_price(self):
+        return self.cost_basis / self.shares if self.shares else 0.0
+
+
+# Per-asset positions updated in O(1) (amortized, for FIFO) per Buy/Sell,
+# so asset pages never rescan the whole history
+class Ledger:
+    def __init__(self, method="average"):
+        if method not in COST_METHODS:
+            raise ValueError(f"Unknown cost method: {method}")
+        self.method = method
+        self.positions = {}
+        self.count = 0
+
+    @classmethod
+    def from_history(cls, history, method="average"):
+        ledger = cls(method)
+        for txn in history:
+            ledger.record(txn)
+        return ledger
+
+    def record(self, txn):
+        position = self.positions.setdefault(txn["asset"], Position())
+        position.txn_ids.append(self.count)
+        self.count += 1
+
+        shares = txn["shares"]
+        if txn["action"] == "Buy":
+            position.shares += shares
+            position.cost_basis += txn["total"]
+            if self.method == "fifo":
+                position.lots.append([shares, txn["price"]])
+            return
+
+        sold = min(shares, position.shares)
+        if sold <= 0:
+            return
+        if self.method == "fifo":
+            removed = 0.0
+            remaining = sold
+            while remaining > 1e-12 and position.lots:
+                lot = position.lots[0]
+                take = min(lot[0], remaining)
+                removed += take * lot[1]
+                lot[0] -= take
+                remaining -= take
+                if lot[0] <= 1e-12:
+                    position.lots.popleft()
+        else:
+            removed = position.cost_basis * sold / position.shares
+        position.realized_pnl += sold * txn["price"] - removed
+        position.shares -= sold
+        position.cost_basis -= removed
+        if position.shares <= 1e-9:
+            position.shares = 0.0
+            position.cost_basis = 0.0
+            position.lots.clear()
+
+    def position(self, asset):
+        return self.positions.get(asset)
+
+    def cost_basis(self):
+        return {asset: p.cost_basis for asset, p in self.positions.items() if p.shares > 0}
+
+    def transactions(self, asset, history):
+        position = self.positions.get(asset)
+        if position is None:
+            return []
+        return [history[i] for i in position.txn_ids]
@@ -0,0 +1,150 @@
+# market_cache.py
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Process-wide cache shared by every Streamlit session. Entries expire
+# after their TTL and the least recently used ones are evicted once the
+# estimated size passes MAX_BYTES. Concurrent requests for the same key
+# wait for a single upstream fetch instead of each fetching it.
+MAX_BYTES = int(os.getenv("MARKET_CACHE_MB", 64)) * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60
+
+
+def estimate_size(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.results = {}
+        self.error = None
+
+
+class MarketDataCache:
+    def __init__(self, max_bytes=MAX_BYTES, default_ttl=DEFAULT_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] <= now:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[0]
+
+    def get(self, key, default=None):
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+            self.stats["hits" if found else "misses"] += 1
+            return value if found else default
+
+    def set(self, key, value, ttl=None):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+            self._entries[key] = (value, expires, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def get_many_or_fetch(self, keys, fetch_many, ttl=None, store=True):
+        # fetch_many(missing_keys) -> {key: value}. Keys that are already
+        # being fetched by another thread are waited on, not refetched.
+        # With store=False the results are only shared with those waiters.
+        results = {}
+        waiting = {}
+        missing = []
+        with self._lock:
+            now = time.monotonic()
+            for key in dict.fromkeys(keys):
+                found, value = self._lookup(key, now)
+                if found:
+                    self.stats["hits"] += 1
+                    results[key] = value
+                elif key in self._inflight:
+                    self.stats["coalesced"] += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self.stats["misses"] += 1
+                    missing.append(key)
+            flight = _Flight()
+            for key in missing:
+                self._inflight[key] = flight
+
+        if missing:
+            try:
+                flight.results = fetch_many(missing)
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                if store:
+                    for key, value in flight.results.items():
+                        self.set(key, value, ttl)
+                with self._lock:
+                    for key in missing:
+                        self._inflight.pop(key, None)
+                flight.done.set()
+            results.update(flight.results)
+
+        for key, other in waiting.items():
+            other.done.wait()
+            if other.error is not None and len(keys) == 1:
+                raise other.error
+            if key in other.results:
+                results[key] = other.results[key]
+        return results
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        return self.get_many_or_fetch([key], lambda keys: {key: fetch()}, ttl)[key]
+
+    def coalesce(self, key, fetch):
+        # Single-flight only, for data kept elsewhere: concurrent callers
+        # share one fetch and nothing is stored here
+        return self.get_many_or_fetch([key], lambda keys: {key: fetch()}, store=False)[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self.bytes}
+
+
+cache = MarketDataCache()
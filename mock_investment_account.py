@@ -1,18 +1,14 @@
-import shutil
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-import plotly.express as px
 from datetime import datetime
-import os
 import random
-import json
 from streamlit_autorefresh import st_autorefresh
-from dateutil import parser
-from helpers import generate_asset_page
-import requests
-from bs4 import BeautifulSoup
-import finnhub
+from value_log import to_timestamp
+from helpers import cached_section, get_ledger, init_account_state, record_event, record_transaction
+from price_snapshot import get_price_snapshot, live_refresh_interval
+from fundamentals import get_fundamentals
+from symbol_catalog import get_catalog
+from holdings_engine import Holdings
 import sidebar
 
 # --------------------------
@@ -28,14 +24,7 @@ sidebar.render_sidebar()
 # --------------------------
 # Initialize session state
 # --------------------------
-if 'cash_balance' not in st.session_state:
-    st.session_state.cash_balance = 100000
-if 'portfolio' not in st.session_state:
-    st.session_state.portfolio = {}
-if 'history' not in st.session_state:
-    st.session_state.history = []
-if 'portfolio_value_log' not in st.session_state:
-    st.session_state.portfolio_value_log = []
+init_account_state()
 if 'selected_ticker' not in st.session_state:
     st.session_state.selected_ticker = None
 
@@ -43,28 +32,28 @@ if 'selected_ticker' not in st.session_state:
 # Helper Functions
 # --------------------------
 def get_live_price(symbol):
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1d")
-        if not hist.empty:
-            return hist["Close"].iloc[-1]
-        else:
-            return ticker.info.get("regularMarketPrice", None)
-    except Exception as e:
-        st.warning(f"⚠️ Live price not available for {symbol}")
-        return None
+    return get_price_snapshot().get(symbol)
+
+def get_portfolio_prices():
+    return get_price_snapshot().get_many(st.session_state.portfolio.keys())
+
+def portfolio_version():
+    return (st.session_state.get("portfolio_version", 0), get_price_snapshot().version)
+
+def get_valuation(prices=None):
+    holdings = Holdings.from_portfolio(
+        st.session_state.portfolio,
+        theme_map,
+        get_ledger().cost_basis()
+    )
+    return holdings.value(get_portfolio_prices() if prices is None else prices)
 
 def calculate_portfolio_value():
-    total = 0
-    for asset, shares in st.session_state.portfolio.items():
-        price = get_live_price(asset)
-        if price is not None:
-            total += shares * price
-    return total
+    return get_valuation().total
 
 def log_portfolio_value():
     value = calculate_portfolio_value() + st.session_state.cash_balance
-    st.session_state.portfolio_value_log.append({
+    record_event("value", {
         "date": datetime.now().isoformat(),
         "value": value
     })
@@ -73,14 +62,14 @@ def dividends():
     total_dividends = 0
     for asset, shares in st.session_state.portfolio.items():
         try:
-            info = yf.Ticker(asset).info
+            info = get_fundamentals(asset)
             yield_annual = info.get("dividendYield", 0)
             if yield_annual:
                 monthly_yield = yield_annual / 12
                 price = get_live_price(asset)
                 if price:
                     total_dividends += shares * price * monthly_yield
-        except:
+        except Exception:
             continue
     return total_dividends
 
@@ -97,16 +86,10 @@ def portfolio_health_score():
     else:
         return "Good", "Nice start! Add a few more asset types to reduce risk."
 
-def risk_indicator():
-    risky_assets = ["BTC-USD", "ETH-USD"]
-    risky_weight = sum(
-        st.session_state.portfolio.get(asset, 0) * get_live_price(asset)
-        for asset in risky_assets if asset in st.session_state.portfolio
-    )
-    total = calculate_portfolio_value()
-    if total == 0:
+def risk_indicator(valuation):
+    if valuation.total == 0:
         return "N/A"
-    ratio = risky_weight / total
+    ratio = valuation.risk_ratio("Volatile")
     if ratio > 0.7:
         return "⚠️ High Risk - Too much in volatile assets"
     elif ratio > 0.4:
@@ -114,22 +97,9 @@ def risk_indicator():
     else:
         return "🟢 Low Risk"
 
-def fetch_trending_stocks(limit=5):
-    url = "https://finance.yahoo.com/trending-tickers"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-        table = soup.find("table")
-        df = pd.read_html(str(table))[0]
-        return df["Symbol"].head(limit).tolist()
-    except Exception as e:
-        st.warning("⚠️ Could not fetch trending stocks.")
-        return []
 def get_stock_info(symbol):
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = get_fundamentals(symbol)
         return {
             "symbol": symbol,
             "name": info.get("shortName", "N/A"),
@@ -137,10 +107,14 @@ def get_stock_info(symbol):
             "summary": info.get("longBusinessSummary", "No description available."),
             "sector": info.get("sector", "N/A"),
         }
-    except:
+    except Exception:
         return None
 
 
+# Number of matches offered in the stock selectbox
+SEARCH_RESULT_LIMIT = 50
+ASSET_PAGE = "pages/asset_dashboard.py"
+
 # --------------------------
 # Theme Map
 # --------------------------
@@ -159,10 +133,25 @@ theme_map = {
 st.title("Student Stock Simulator")
 st.subheader("Start with $100,000 of free money and learn how to invest!")
 
-nasdaq_df = pd.read_csv("extended_nasdaq_symbols.csv")
-nasdaq_df["label"] = nasdaq_df["Symbol"] + " - " + nasdaq_df["Company Name"]
-selected_label = st.selectbox("Select a stock:", nasdaq_df["label"])
+catalog = get_catalog()
+search_query = st.text_input("Search stocks:", placeholder="Type a symbol or company name, e.g. AAPL or Apple")
+with st.expander("Search filters"):
+    etf_choice = st.radio("Fund type", ["All", "Stocks only", "ETFs only"], horizontal=True)
+    market_categories = st.multiselect("Market category", ["Q", "G", "S"], help="Q = Global Select, G = Global Market, S = Capital Market")
+    include_test_issues = st.checkbox("Include test issues", value=False)
+search_filters = {
+    "etf": {"All": None, "Stocks only": False, "ETFs only": True}[etf_choice],
+    "market_category": market_categories,
+    "test_issue": None if include_test_issues else False,
+}
+search_results = catalog.search_labels(search_query, limit=SEARCH_RESULT_LIMIT, **search_filters)
+if not search_results:
+    st.caption("No matching symbols, showing the full list instead.")
+    search_results = catalog.search_labels("", limit=SEARCH_RESULT_LIMIT)
+selected_label = st.selectbox("Select a stock:", search_results)
 user_ticker = selected_label.split(" - ")[0]
+# Fetch the selected ticker and every holding in one batched request
+get_price_snapshot().get_many([user_ticker, *st.session_state.portfolio])
 price = get_live_price(user_ticker)
 
 
@@ -181,9 +170,7 @@ if st.button("Buy"):
     if total_cost > st.session_state.cash_balance:
         st.error("Not enough cash!")
     elif shares_to_buy > 0:
-        st.session_state.cash_balance -= total_cost
-        st.session_state.portfolio[user_ticker] = st.session_state.portfolio.get(user_ticker, 0) + shares_to_buy
-        st.session_state.history.append({
+        record_transaction({
             "date": datetime.now(),
             "action": "Buy",
             "asset": user_ticker,
@@ -191,9 +178,9 @@ if st.button("Buy"):
             "price": price,
             "total": total_cost
         })
-        generate_asset_page(user_ticker)
         log_portfolio_value()
         st.success(f"Bought {shares_to_buy:.6f} shares of {user_ticker} at ${price:.2f} each.")
+        st.page_link(ASSET_PAGE, label=f"Open the {user_ticker} dashboard", icon="📉", query_params={"ticker": user_ticker, "account": st.session_state.account_id})
 
 # Sell Section
 st.markdown("### Sell Stocks")
@@ -213,14 +200,7 @@ if st.session_state.portfolio:
         sell_price = get_live_price(sell_asset)
         if sell_shares <= max_shares and sell_shares > 0 and sell_price:
             revenue = sell_shares * sell_price
-            st.session_state.cash_balance += revenue
-            st.session_state.portfolio[sell_asset] -= sell_shares
-            st.session_state.portfolio[sell_asset] = round(st.session_state.portfolio[sell_asset], 6)
-
-            if st.session_state.portfolio[sell_asset] <= 0:
-                del st.session_state.portfolio[sell_asset]
-
-            st.session_state.history.append({
+            record_transaction({
                 "date": datetime.now(),
                 "action": "Sell",
                 "asset": sell_asset,
@@ -240,50 +220,76 @@ st.progress(remaining_percent)
 st.write(f"💵 You have {remaining_percent*100:.1f}% of your $100,000 remaining.")
 
 # Portfolio Overview
+@st.fragment(run_every=live_refresh_interval())
+def live_portfolio_value():
+    # Reruns on its own as feed ticks arrive, without rerunning the page
+    st.metric(label=" Portfolio Value", value=f"${calculate_portfolio_value():,.2f}")
+
 st.markdown("### Your Portfolio")
+# Refresh prices before taking the key: fetching can bump the snapshot
+# version, and the valuation must be cached under the version it was built from
+portfolio_prices = get_portfolio_prices()
+valuation = cached_section("valuation", portfolio_version(), lambda: get_valuation(portfolio_prices))
 if st.session_state.portfolio:
-    df = pd.DataFrame([
-        {
-            "Asset": k,
-            "Shares": v,
-            "Current Price": get_live_price(k),
-            "Value": v * get_live_price(k)
-        } for k, v in st.session_state.portfolio.items()
-        if get_live_price(k) is not None
-    ])
+    df = valuation.positions_frame()
     df["Value"] = df["Value"].round(2)
-    st.dataframe(df.style.format({"Value": "${:,.2f}", "Current Price": "${:,.2f}"}))
-    st.metric(label=" Portfolio Value", value=f"${df['Value'].sum():,.2f}")
+    st.dataframe(df.style.format({
+        "Value": "${:,.2f}",
+        "Current Price": "${:,.2f}",
+        "Weight": "{:.1%}",
+        "Unrealized P&L": "${:,.2f}"
+    }))
+    live_portfolio_value()
+    stale = [k for k in st.session_state.portfolio if get_price_snapshot().is_stale(k)]
+    if stale:
+        st.caption(f"⏳ Price refresh failed, showing last known price for: {', '.join(stale)}")
+    unavailable = [k for k in st.session_state.portfolio if get_price_snapshot().is_unavailable(k)]
+    if unavailable:
+        st.caption(f"⚠️ No price available yet for: {', '.join(unavailable)}")
+    dashboard_asset = st.selectbox("Asset dashboard", list(st.session_state.portfolio.keys()))
+    st.page_link(ASSET_PAGE, label=f"Open the {dashboard_asset} dashboard", icon="📉", query_params={"ticker": dashboard_asset, "account": st.session_state.account_id})
 else:
     st.info("You haven't bought anything yet.")
 
+# Sections below are only computed while their expander is open, and
+# reuse their last result until the holdings or prices change. Plotly
+# Express is imported on first use, so closed sections don't load it.
+
 # Theme Breakdown
-theme_summary = {}
-for ticker, shares in st.session_state.portfolio.items():
-    theme = theme_map.get(ticker, "Other")
-    p = get_live_price(ticker)
-    if p:
-        value = shares * p
-        theme_summary[theme] = theme_summary.get(theme, 0) + value
-
-theme_df = pd.DataFrame(list(theme_summary.items()), columns=["Theme", "Total Value"])
-theme_df["Total Value"] = theme_df["Total Value"].astype(float).round(2)
+def build_theme_breakdown():
+    import plotly.express as px
+
+    theme_df = valuation.theme_frame()
+    theme_df["Total Value"] = theme_df["Total Value"].astype(float).round(2)
+    return theme_df, px.pie(theme_df, names="Theme", values="Total Value", title="Portfolio Allocation")
+
 st.markdown("### 🎯 Portfolio Breakdown by Theme")
-st.dataframe(theme_df)
-st.plotly_chart(px.pie(theme_df, names="Theme", values="Total Value", title="Portfolio Allocation"))
+theme_section = st.expander("Show theme breakdown", key="theme_section", on_change="rerun")
+if theme_section.open:
+    theme_df, theme_fig = cached_section("themes", portfolio_version(), build_theme_breakdown)
+    with theme_section:
+        st.dataframe(theme_df)
+        st.plotly_chart(theme_fig)
 
 # Portfolio Growth Tracking (auto-log every 60s)
-if len(st.session_state.portfolio_value_log) == 0 or (
-    datetime.now() - parser.parse(str(st.session_state.portfolio_value_log[-1]["date"]))
-).seconds >= 60:
+last_logged = st.session_state.portfolio_value_log.last_timestamp()
+if last_logged is None or to_timestamp(datetime.now()) - last_logged >= 60:
     log_portfolio_value()
 
+def build_growth_chart():
+    import plotly.express as px
+
+    value_df = st.session_state.portfolio_value_log.chart_frame()
+    return px.line(value_df, x="date", y="value", title="Portfolio Value Over Time")
+
 st.markdown("### Portfolio Growth Tracker")
-value_df = pd.DataFrame(st.session_state.portfolio_value_log)
-fig = px.line(value_df, x="date", y="value", title="Portfolio Value Over Time")
-st.plotly_chart(fig)
+growth_section = st.expander("Show growth chart", key="growth_section", on_change="rerun")
+if growth_section.open:
+    growth_key = st.session_state.portfolio_value_log.last_timestamp()
+    with growth_section:
+        st.plotly_chart(cached_section("growth", growth_key, build_growth_chart))
 
-gain_percent = ((value_df["value"].iloc[-1] - 100000) / 100000) * 100
+gain_percent = ((st.session_state.portfolio_value_log.last_value() - 100000) / 100000) * 100
 st.metric("Total Gain", f"{gain_percent:.2f}%")
 
 # Analytics
@@ -291,16 +297,24 @@ st.markdown("## Analytics & Feedback")
 score, feedback = portfolio_health_score()
 st.success(f"**Portfolio Health Score:** {score} — {feedback}")
 st.markdown("### Risk Level")
-st.warning(risk_indicator())
+st.warning(risk_indicator(valuation))
 st.markdown("### Estimated Monthly Dividends")
-st.info(f"Estimated Monthly Dividends: ${dividends():.2f}")
+dividend_section = st.expander("Estimate dividends", key="dividend_section", on_change="rerun")
+if dividend_section.open:
+    with dividend_section:
+        monthly_dividends = cached_section("dividends", portfolio_version(), dividends)
+        st.info(f"Estimated Monthly Dividends: ${monthly_dividends:.2f}")
 
 # History
 st.markdown("### Transaction History")
-if st.session_state.history:
-    st.dataframe(pd.DataFrame(st.session_state.history))
-else:
-    st.info("No transactions yet.")
+history_section = st.expander("Show transactions", key="history_section", on_change="rerun")
+if history_section.open:
+    with history_section:
+        if st.session_state.history:
+            history_df = cached_section("history", len(st.session_state.history), lambda: pd.DataFrame(st.session_state.history))
+            st.dataframe(history_df)
+        else:
+            st.info("No transactions yet.")
 
 # Tips
 tips = [
@@ -0,0 +1,144 @@
+# monte_carlo.py
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from projection import balance_paths
+from worker_pool import get_pool
+
+# Monte Carlo what-if runs. Monthly returns are drawn for a chunk of paths
+# at a time and turned into balance paths with projection.balance_paths.
+# Chunks run in a process pool, and each one only sends back a per-month
+# histogram of balances on a fixed log scale, so memory stays bounded no
+# matter how many paths are simulated. Percentiles are read off the
+# merged histogram (to within a fraction of a bin, about 2%).
+CHUNK_PATHS = int(os.getenv("MC_CHUNK_PATHS", 4096))
+MC_WORKERS = int(os.getenv("MC_WORKERS", os.cpu_count() or 1))
+BINS_PER_DECADE = 100
+# Balances are binned between $1 and $10B; anything outside lands in the
+# first or last bin. Column 0 of a histogram holds $0 balances (nothing
+# invested yet), which have no log; the log bins follow it.
+LOG_MIN, LOG_MAX = 0, 10
+BINS = (LOG_MAX - LOG_MIN) * BINS_PER_DECADE
+COLUMNS = BINS + 1
+PERCENTILES = (5, 25, 50, 75, 95)
+# A month can't lose more than this, whatever the model draws
+MAX_MONTHLY_LOSS = 0.99
+
+
+def normal_returns(rng, paths, months, annual_return=0.07, annual_volatility=0.15):
+    return rng.normal(annual_return / 12, annual_volatility / np.sqrt(12), (paths, months))
+
+
+def bootstrap_returns(rng, paths, months, history):
+    # history: past monthly returns, resampled with replacement
+    history = np.asarray(history, dtype=float)
+    return history[rng.integers(0, len(history), (paths, months))]
+
+
+def regime_returns(rng, paths, months, bull_return=0.12, bull_volatility=0.12,
+                   bear_return=-0.15, bear_volatility=0.25, bull_stay=0.98, bear_stay=0.90):
+    # Two-state Markov chain: each month a path stays in its regime with
+    # the given probability, otherwise it switches
+    mean = np.array([bull_return, bear_return]) / 12
+    volatility = np.array([bull_volatility, bear_volatility]) / np.sqrt(12)
+    stay = np.array([bull_stay, bear_stay])
+    switches = rng.random((paths, months))
+    states = np.empty((paths, months), dtype=np.intp)
+    state = np.zeros(paths, dtype=np.intp)
+    for month in range(months):
+        state = np.where(switches[:, month] < stay[state], state, 1 - state)
+        states[:, month] = state
+    return mean[states] + volatility[states] * rng.standard_normal((paths, months))
+
+
+MODELS = {
+    "normal": normal_returns,
+    "bootstrap": bootstrap_returns,
+    "regime": regime_returns,
+}
+
+
+def monthly_history(close):
+    # Month-end closes -> monthly returns, for the bootstrap model
+    return close.resample("ME").last().pct_change().dropna().to_numpy().ravel()
+
+
+def _bin_index(balances):
+    positive = balances > 0
+    logs = np.log10(np.where(positive, balances, 1))
+    index = np.clip(((logs - LOG_MIN) * BINS_PER_DECADE).astype(np.intp, copy=False), 0, BINS - 1) + 1
+    return np.where(positive, index, 0)
+
+
+def _simulate_chunk(seed, paths, months, model, params, monthly, initial, annual_fee, target):
+    rng = np.random.default_rng(seed)
+    returns = MODELS[model](rng, paths, months, **params) - annual_fee / 12
+    factors = 1 + np.maximum(returns, -MAX_MONTHLY_LOSS)
+    balances = balance_paths(factors, monthly, initial)
+    # One bincount over (month, bin) pairs builds every month's histogram
+    flat = _bin_index(balances) + np.arange(months) * COLUMNS
+    counts = np.bincount(flat.ravel(), minlength=months * COLUMNS).reshape(months, COLUMNS)
+    final = balances[:, -1]
+    return counts, int(np.count_nonzero(final < target)), float(final.sum())
+
+
+def histogram_percentiles(counts, percentiles=PERCENTILES):
+    # counts: (months, COLUMNS). Interpolates linearly in log space within
+    # the bin that holds each percentile.
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1:]
+    columns = {}
+    for p in percentiles:
+        rank = p / 100 * total
+        index = np.minimum((cumulative < rank).sum(axis=1), COLUMNS - 1)
+        before = np.where(index > 0, np.take_along_axis(cumulative, (index - 1)[:, None], 1)[:, 0], 0)
+        inside = counts[np.arange(len(counts)), index]
+        fraction = np.where(inside > 0, (rank[:, 0] - before) / np.maximum(inside, 1), 0)
+        log_value = LOG_MIN + (index - 1 + fraction) / BINS_PER_DECADE
+        columns[f"p{p}"] = np.where(index == 0, 0.0, 10 ** log_value)
+    return pd.DataFrame(columns, index=pd.RangeIndex(1, len(counts) + 1, name="month"))
+
+
+@dataclass
+class MonteCarloResult:
+    paths: int
+    months: int
+    target: float
+    bands: pd.DataFrame
+    shortfall_probability: float
+    mean_final: float
+
+
+def simulate(model, monthly, months, paths=10000, initial=0.0, annual_fee=0.0,
+             target=None, seed=None, chunk_size=CHUNK_PATHS, **params):
+    # target defaults to the total amount invested, so the shortfall
+    # probability is the chance of ending up with less than was put in
+    if target is None:
+        target = initial + monthly * months
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(s, n, months, model, params, monthly, initial, annual_fee, target) for s, n in zip(seeds, sizes)]
+
+    if len(args) == 1 or MC_WORKERS <= 1:
+        chunks = (_simulate_chunk(*a) for a in args)
+    else:
+        chunks = get_pool("monte_carlo", MC_WORKERS).map(_simulate_chunk, *zip(*args))
+
+    counts = np.zeros((months, COLUMNS), dtype=np.int64)
+    shortfalls = 0
+    final_sum = 0.0
+    for chunk_counts, chunk_shortfalls, chunk_sum in chunks:
+        counts += chunk_counts
+        shortfalls += chunk_shortfalls
+        final_sum += chunk_sum
+    return MonteCarloResult(
+        paths=paths,
+        months=months,
+        target=target,
+        bands=histogram_percentiles(counts),
+        shortfall_probability=shortfalls / paths,
+        mean_final=final_sum / paths,
+    )
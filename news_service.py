@@ -0,0 +1,160 @@
+# news_service.py
+import os
+import threading
+from collections import OrderedDict
+
+from clients import get_finnhub_client
+from market_cache import cache
+from upstream import Backoff, UpstreamError, get_upstream
+
+# Headlines for every page come from memory. Each feed is refreshed at most
+# once per NEWS_TTL_SECONDS across all sessions (concurrent callers share
+# one refresh through the market cache):
+#   - Yahoo RSS per symbol, with ETag/Last-Modified so unchanged feeds are
+#     a 304 with no body
+#   - Finnhub market news, asking only for articles newer than the last id
+# Articles are deduped by id/URL and the newest MAX_ARTICLES are kept per
+# feed, for at most MAX_FEEDS feeds (least recently read dropped first).
+# A feed whose refresh failed isn't refreshed again until its backoff
+# (doubling with each failure in a row) has passed.
+# tools/stub_news.py serves both feeds locally for offline runs.
+NEWS_TTL_SECONDS = 300
+MAX_ARTICLES = 20
+MAX_FEEDS = 200
+FETCH_TIMEOUT_SECONDS = 5
+MAX_FAILURE_BACKOFF_SECONDS = 4 * NEWS_TTL_SECONDS
+RSS_URL = os.getenv("NEWS_RSS_URL", "https://finance.yahoo.com/rss/headline?s={symbol}")
+MARKET = "market"
+
+
+class _Feed:
+    def __init__(self):
+        self.articles = OrderedDict()
+        self.lock = threading.Lock()
+        self.etag = None
+        self.last_modified = None
+        self.last_id = 0
+
+    def add(self, articles):
+        # An article already seen (same id, or same URL without an id) is skipped
+        with self.lock:
+            for article in articles:
+                key = article["id"] or article["url"]
+                if key and key not in self.articles:
+                    self.articles[key] = article
+            if len(self.articles) > MAX_ARTICLES:
+                newest = sorted(self.articles.items(), key=lambda item: item[1]["published"], reverse=True)
+                self.articles = OrderedDict(newest[:MAX_ARTICLES])
+
+    def latest(self, limit):
+        with self.lock:
+            articles = list(self.articles.values())
+        return sorted(articles, key=lambda article: article["published"], reverse=True)[:limit]
+
+
+def _from_rss(entry):
+    published = entry.get("published_parsed")
+    return {
+        "id": entry.get("id"),
+        "headline": entry.get("title", ""),
+        "url": entry.get("link", ""),
+        "summary": entry.get("summary", ""),
+        "published": tuple(published) if published else (),
+    }
+
+
+def _from_finnhub(item):
+    return {
+        "id": str(item.get("id", "")),
+        "headline": item.get("headline", ""),
+        "url": item.get("url", ""),
+        "summary": item.get("summary", ""),
+        "published": item.get("datetime", 0),
+    }
+
+
+class NewsService:
+    def __init__(self, finnhub_client=None):
+        self.finnhub_client = finnhub_client
+        self._feeds = OrderedDict()
+        self._backoff = Backoff(max_seconds=MAX_FAILURE_BACKOFF_SECONDS)
+        self._lock = threading.Lock()
+
+    def _feed(self, key):
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = _Feed()
+                while len(self._feeds) > MAX_FEEDS:
+                    self._feeds.popitem(last=False)
+            self._feeds.move_to_end(key)
+            return feed
+
+    def _refresh_rss(self, symbol):
+        import feedparser
+
+        feed = self._feed(symbol)
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+        response = get_upstream("yahoo").get(RSS_URL.format(symbol=symbol), headers=headers, timeout=FETCH_TIMEOUT_SECONDS)
+        if response.status_code == 304:
+            return True
+        feed.etag = response.headers.get("ETag")
+        feed.last_modified = response.headers.get("Last-Modified")
+        feed.add(_from_rss(entry) for entry in feedparser.parse(response.content).entries)
+        return True
+
+    def _refresh_market(self):
+        feed = self._feed(MARKET)
+        if self.finnhub_client is None:
+            self.finnhub_client = get_finnhub_client()
+        items = get_upstream("finnhub").call(self.finnhub_client.general_news, "general", min_id=feed.last_id)
+        feed.add(_from_finnhub(item) for item in items)
+        feed.last_id = max([feed.last_id] + [item.get("id", 0) for item in items])
+        return True
+
+    def _read(self, key, refresh, limit):
+        feed = self._feed(key)
+        if self._backoff.remaining(key):
+            if not feed.articles:
+                raise UpstreamError(f"News for {key} is unavailable")
+            return feed.latest(limit)
+        try:
+            cache.get_or_fetch(("news", key), refresh, ttl=NEWS_TTL_SECONDS)
+        except Exception:
+            self._backoff.record_failure(key)
+            # Keep serving what we have; with nothing stored, let the page say so
+            if not feed.articles:
+                raise
+        else:
+            self._backoff.record_success(key)
+        return feed.latest(limit)
+
+    def symbol_news(self, symbol, limit=5):
+        return self._read(symbol, lambda: self._refresh_rss(symbol), limit)
+
+    def market_news(self, limit=5):
+        return self._read(MARKET, self._refresh_market, limit)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_news_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = NewsService()
+        return _service
+
+
+def get_symbol_news(symbol, limit=5):
+    return get_news_service().symbol_news(symbol, limit)
+
+
+def get_market_news(limit=5):
+    return get_news_service().market_news(limit)
@@ -0,0 +1,109 @@
+import streamlit as st
+import plotly.express as px
+import pandas as pd
+from streamlit_autorefresh import st_autorefresh
+from helpers import get_ledger, get_transactions_for_asset, init_account_state
+from history_store import get_history
+from fundamentals import get_fundamentals
+from news_service import get_symbol_news
+from price_snapshot import get_price_snapshot, live_refresh_interval
+from sidebar import render_sidebar
+
+# One dashboard for every asset, selected with ?ticker=SYMBOL
+render_sidebar()
+init_account_state()
+
+ticker = st.query_params.get("ticker")
+if not ticker:
+    st.title("📉 Asset Dashboard")
+    holdings = list(st.session_state.get("portfolio", {}))
+    if not holdings:
+        st.info("Buy an asset on the main page to see its dashboard here.")
+        st.stop()
+    ticker = st.selectbox("Choose an asset:", holdings)
+    st.query_params["ticker"] = ticker
+
+ticker = ticker.upper()
+st_autorefresh(interval=60000, key="refresh_asset")
+
+st.title("📉 " + ticker + " – Asset Dashboard")
+
+try:
+    info = get_fundamentals(ticker)
+except Exception:
+    info = {}
+    st.caption("Company details are unavailable right now.")
+price = get_price_snapshot().get(ticker)
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.subheader("🏢 Company Info")
+    st.markdown(f"**Name:** {info.get('shortName', 'N/A')}")
+    st.markdown(f"**Industry:** {info.get('industry', 'N/A')}")
+    st.markdown(f"**Sector:** {info.get('sector', 'N/A')}")
+
+@st.fragment(run_every=live_refresh_interval())
+def live_price():
+    live = get_price_snapshot().get(ticker)
+    if live:
+        st.metric(label=f"{ticker} Price", value=f"${live:,.2f}")
+    else:
+        st.write("N/A")
+
+with col2:
+    st.subheader("💰 Live Price")
+    live_price()
+
+with col3:
+    st.subheader("📊 Key Financials")
+    market_cap = info.get('marketCap')
+    pe_ratio = info.get('trailingPE')
+    dividend_yield = info.get('dividendYield')
+
+    st.metric(label="Market Cap", value=f"${market_cap:,}" if market_cap else "N/A", help="The total value of all a company's shares of stock.")
+    st.metric(label="P/E Ratio", value=f"{pe_ratio:.2f}" if pe_ratio else "N/A", help="Price-to-Earnings ratio: shows how much investors are willing to pay per dollar of earnings.")
+    st.metric(label="Dividend Yield", value=f"{dividend_yield * 100:.2f}%" if dividend_yield else "N/A", help="How much a company returns to shareholders as dividends, annually as a % of stock price.")
+
+st.header("📊 Price Trend")
+timeframe = st.radio("Select timeframe:", ["7 Days", "1 Month", "1 Year"], horizontal=True)
+period_map = {
+    "7 Days": "7d",
+    "1 Month": "1mo",
+    "1 Year": "1y"
+}
+period = period_map[timeframe]
+
+try:
+    df = get_history(ticker, period)
+    fig = px.line(df, x=df.index, y="Close", title=ticker + " - Price Trend (" + timeframe + ")")
+    st.plotly_chart(fig)
+except Exception as e:
+    st.warning("Error loading chart: " + str(e))
+
+st.header("🧾 Your Transactions for This Asset")
+txns = get_transactions_for_asset(ticker)
+position = get_ledger().position(ticker)
+
+if not txns.empty:
+    avg_buy_price = position.average_price
+    if position.shares and price:
+        gain = ((price - avg_buy_price) / avg_buy_price) * 100 if avg_buy_price else 0
+        st.metric("📈 Unrealized Return", f"{gain:.2f}%", delta=f"${price - avg_buy_price:.2f}", help="Your % return if you sold at the current price vs. what you paid.")
+    st.metric("💵 Realized P&L", f"${position.realized_pnl:,.2f}", help="Profit or loss locked in by the shares you have already sold.")
+else:
+    st.info("No transactions for this asset yet.")
+
+if not txns.empty:
+    st.dataframe(txns)
+
+st.header("📰 Latest News on " + ticker)
+try:
+    articles = get_symbol_news(ticker)
+    if articles:
+        for article in articles:
+            st.markdown(f"- [{article['headline']}]({article['url']})")
+    else:
+        st.info("No news articles found.")
+except Exception as e:
+    st.warning("Error fetching news: " + str(e))
@@ -1,21 +1,28 @@
 import streamlit as st
-import os
 import re
 import plotly.graph_objs as go
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
-from openai import OpenAI
 import sidebar 
+from chat_service import stream_reply
+from backtest import STRATEGIES, run_backtest, sweep
+from helpers import init_account_state
+from history_store import get_close
+from monte_carlo import monthly_history, simulate
+from projection import compare, project, scenario_grid
+from text_normalize import clean_user_input, display_text
 
 # Page config
 st.set_page_config(page_title="ZenBot - What If Simulator", page_icon="🤖")
 st.title("💬 What-If Investment Simulator")
 
-# Load shared sidebar
-sidebar.load_sidebar()
+# Load shared sidebar and this session's account
+sidebar.render_sidebar()
+init_account_state()
 
 # Load OpenAI API key
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # Session state
 if "messages" not in st.session_state:
@@ -51,44 +58,11 @@ system_msg = {
 }
 
 # --- Utility Functions ---
-def sanitize_response(text):
-    text = re.sub(r"`+", "", text)
-    text = re.sub(r"_([^_]+)_", r"\1", text)
-    text = re.sub(r"([a-zA-Z])(\d)", r"\1 \2", text)
-    text = re.sub(r"(\d)([a-zA-Z])", r"\1 \2", text)
-    text = re.sub(r"\s*,\s*", ", ", text)
-    text = re.sub(r"(?<=[a-zA-Z])(?=[A-Z])", " ", text)
-    return text
-
-def clean_user_input(text):
-    text = re.sub(r"(\d),\s*(\d)", r"\1\2", text)  # Fix comma spacing: 1, 000 -> 1000
-    text = re.sub(r"nowversus", "now versus ", text)  # Fix merged words
-    text = re.sub(r"(\d)([a-zA-Z])", r"\1 \2", text)  # 100now -> 100 now
-    text = re.sub(r"([a-zA-Z])(\d)", r"\1 \2", text)  # versus100 -> versus 100
-    return text
-
-def simulate_investment_growth(monthly_investment, years, annual_return):
-    months = years * 12
-    total = 0
-    balance = []
-    for i in range(months):
-        total += monthly_investment
-        total *= (1 + annual_return / 12)
-        balance.append(total)
-    return balance
-
-def simulate_market_crash(monthly_investment, years, annual_return, crash_year=2, crash_percent=0.3):
-    months = years * 12
-    crash_month = crash_year * 12
-    total = 0
-    balance = []
-    for i in range(1, months + 1):
-        total += monthly_investment
-        total *= (1 + annual_return / 12)
-        if i == crash_month:
-            total *= (1 - crash_percent)
-        balance.append(total)
-    return balance
+def simulate_investment_growth(monthly_investment, months, annual_return):
+    return project(monthly_investment, months, annual_return)[0]
+
+def simulate_market_crash(monthly_investment, months, annual_return, crash_year=2, crash_percent=0.3):
+    return project(monthly_investment, months, annual_return, crash_month=crash_year * 12, crash_percent=crash_percent)[0]
 
 def plot_growth_chart(growth, years, title):
     months = list(range(1, len(growth) + 1))
@@ -147,40 +121,41 @@ def generate_follow_ups(user_input):
             "What if inflation outpaces my investment returns?"
         ]
 
-def get_chat_response(user_input):
-    messages = [system_msg] + st.session_state.messages + [{"role": "user", "content": user_input}]
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
-        temperature=0.7,
-    )
-    return response.choices[0].message.content
+def get_chat_response(user_input, context_free=False):
+    # Streams the reply onto the page as it arrives, then shows it cleaned up
+    history = list(st.session_state.messages)
+    st.session_state.messages.append({"role": "user", "content": user_input})
+    st.write(f"**You:** {user_input}")
+    placeholder = st.empty()
+    with placeholder:
+        response = st.write_stream(stream_reply(system_msg, history, user_input, context_free))
+    message = {"role": "assistant", "content": response}
+    placeholder.text(f"ZenBot: {display_text(message)}")
+    st.session_state.messages.append(message)
+    return response
 
 # --- Main UI ---
 user_input = st.text_input("What if I...", placeholder="e.g., invest $200/month and markets crash in year 2?")
 
-if user_input:
-    cleaned = clean_user_input(user_input)
-    st.session_state.messages.append({"role": "user", "content": cleaned})
-    response = get_chat_response(cleaned)
-    st.session_state.messages.append({"role": "assistant", "content": response})
-
 # Show conversation
 for msg in st.session_state.messages:
     if msg["role"] == "user":
         st.write(f"**You:** {msg['content']}")
     else:
-        clean = sanitize_response(msg["content"])
-        st.text(f"ZenBot: {clean}")
+        st.text(f"ZenBot: {display_text(msg)}")
+
+# The text input keeps its value across reruns; only ask once per question
+if user_input and user_input != st.session_state.get("last_question"):
+    st.session_state.last_question = user_input
+    get_chat_response(clean_user_input(user_input))
 
 # Suggested follow-up questions
 if user_input:
     st.markdown("#### 🤔 Suggested follow-up questions:")
     for q in generate_follow_ups(user_input):
         if st.button(q):
-            st.session_state.messages.append({"role": "user", "content": q})
-            response = get_chat_response(q)
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            # Follow-ups are standalone questions, so their replies are shared
+            get_chat_response(q, context_free=True)
             st.rerun()
 
 # Chart trigger based on keywords
@@ -193,19 +168,20 @@ if user_input and any(k in user_input.lower() for k in ["invest", "save", "compo
         unit = time_match.group(2)
         time_value = int(time_match.group(1))
         years = round(time_value / 12, 2) if "month" in unit else time_value
+        months = max(1, round(years * 12))
 
         if "crash" in user_input.lower():
-            growth = simulate_market_crash(amount, years, 0.07)
+            growth = simulate_market_crash(amount, months, 0.07)
             title = "Simulated Growth with Market Crash in Year 2"
         else:
-            growth = simulate_investment_growth(amount, years, 0.07)
+            growth = simulate_investment_growth(amount, months, 0.07)
             title = "Simulated Growth (7% Annual Return)"
 
         st.markdown("### 📊 Projection Chart:")
         plot_growth_chart(growth, years, title)
 
         # Add summary stats
-        total_invested = amount * years * 12
+        total_invested = amount * months
         final_balance = growth[-1]
         gain = final_balance - total_invested
 
@@ -218,3 +194,211 @@ if user_input and any(k in user_input.lower() for k in ["invest", "save", "compo
         st.markdown(f"- **Total Invested**: ${total_invested:,.0f}")
         st.markdown(f"- **Final Portfolio Value**: ${final_balance:,.0f}")
         st.markdown(f"- **Total Gain**: ${gain:,.0f} ({gain_percent:.2f}%)")
+
+# --- Scenario Comparison ---
+def plot_scenario_range(paths, title):
+    months = np.arange(1, paths.shape[1] + 1)
+    low, median, high = np.percentile(paths, [0, 50, 100], axis=0)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=high, mode='lines', name='Best Scenario', line=dict(color='#4F8EF7', width=1)))
+    fig.add_trace(go.Scatter(x=months, y=low, mode='lines', name='Worst Scenario', fill='tonexty',
+                             fillcolor='rgba(79, 142, 247, 0.2)', line=dict(color='#4F8EF7', width=1)))
+    fig.add_trace(go.Scatter(x=months, y=median, mode='lines', name='Median Scenario', line=dict(color='orange', width=3)))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Month",
+        yaxis_title="Portfolio Value ($)",
+        plot_bgcolor='white',
+        hovermode='x unified',
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### 🔀 Compare Scenarios")
+compare_section = st.expander("Compare many scenarios side by side", key="compare_section", on_change="rerun")
+if compare_section.open:
+    with compare_section:
+        compare_years = st.slider("Years", 1, 50, 20)
+        monthly_options = st.multiselect("Monthly contribution ($)", [50, 100, 200, 500, 1000, 2000], default=[100, 200, 500])
+        return_options = st.multiselect("Annual return (%)", [2, 3, 4, 5, 6, 7, 8, 10], default=[3, 5, 7])
+        crash_options = st.multiselect("Market crash in year (0 = no crash)", list(range(0, 21)), default=[0, 2, 10])
+        crash_percent = st.slider("Crash size (%)", 0, 90, 30)
+        inflation = st.slider("Inflation (%)", 0.0, 8.0, 2.0, step=0.5)
+        fee_options = st.multiselect("Annual fee (%)", [0.0, 0.25, 0.5, 1.0, 2.0], default=[0.25, 1.0])
+
+        if monthly_options and return_options and crash_options and fee_options:
+            compare_months = compare_years * 12
+            grid = scenario_grid(
+                monthly=monthly_options,
+                annual_return=np.array(return_options) / 100,
+                crash_month=np.array(crash_options) * 12,
+                crash_percent=crash_percent / 100,
+                inflation=inflation / 100,
+                annual_fee=np.array(fee_options) / 100,
+            )
+            paths = project(months=compare_months, **{name: grid[name].to_numpy() for name in grid})
+            plot_scenario_range(paths, f"{len(grid)} Scenarios over {compare_years} Years")
+
+            results = compare(grid, compare_months).sort_values("final", ascending=False)
+            table = pd.DataFrame({
+                "Monthly ($)": results["monthly"],
+                "Return (%)": results["annual_return"] * 100,
+                "Crash Year": (results["crash_month"] // 12).astype(int),
+                "Fee (%)": results["annual_fee"] * 100,
+                "Invested ($)": results["invested"],
+                "Final ($)": results["final"],
+                "Final in Today's $": results["final_real"],
+                "Gain ($)": results["gain"],
+            })
+            st.dataframe(table.style.format({
+                "Invested ($)": "${:,.0f}",
+                "Final ($)": "${:,.0f}",
+                "Final in Today's $": "${:,.0f}",
+                "Gain ($)": "${:,.0f}",
+                "Return (%)": "{:.1f}",
+                "Fee (%)": "{:.2f}",
+            }), hide_index=True)
+        else:
+            st.info("Pick at least one value for each setting.")
+
+# --- Monte Carlo ---
+@st.cache_data(show_spinner="Simulating...")
+def run_monte_carlo(model, monthly, months, paths, annual_fee, params):
+    return simulate(model, monthly, months, paths=paths, annual_fee=annual_fee, seed=0, **dict(params))
+
+def plot_monte_carlo(bands, title):
+    months = bands.index
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=bands["p95"], mode='lines', name='95th Percentile', line=dict(color='#4F8EF7', width=1)))
+    fig.add_trace(go.Scatter(x=months, y=bands["p5"], mode='lines', name='5th Percentile', fill='tonexty',
+                             fillcolor='rgba(79, 142, 247, 0.15)', line=dict(color='#4F8EF7', width=1)))
+    fig.add_trace(go.Scatter(x=months, y=bands["p75"], mode='lines', name='75th Percentile', line=dict(color='#4F8EF7', width=1, dash='dot')))
+    fig.add_trace(go.Scatter(x=months, y=bands["p25"], mode='lines', name='25th Percentile', fill='tonexty',
+                             fillcolor='rgba(79, 142, 247, 0.3)', line=dict(color='#4F8EF7', width=1, dash='dot')))
+    fig.add_trace(go.Scatter(x=months, y=bands["p50"], mode='lines', name='Median', line=dict(color='orange', width=3)))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Month",
+        yaxis_title="Portfolio Value ($)",
+        plot_bgcolor='white',
+        hovermode='x unified',
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### 🎲 Monte Carlo Simulation")
+monte_carlo_section = st.expander("Simulate thousands of possible markets", key="monte_carlo_section", on_change="rerun")
+if monte_carlo_section.open:
+    with monte_carlo_section:
+        model_label = st.radio("Market model", ["Normal returns", "Replay past returns", "Bull and bear markets"], horizontal=True)
+        mc_monthly = st.number_input("Monthly contribution ($)", min_value=0, value=200, step=50)
+        mc_years = st.slider("Years", 1, 50, 30, key="mc_years")
+        mc_paths = st.select_slider("Simulated paths", [10000, 20000, 50000, 100000], value=10000)
+        mc_fee = st.slider("Annual fee (%)", 0.0, 2.0, 0.25, step=0.05, key="mc_fee")
+
+        params = {}
+        if model_label == "Normal returns":
+            model = "normal"
+            params["annual_return"] = st.slider("Average annual return (%)", -5.0, 15.0, 7.0, step=0.5) / 100
+            params["annual_volatility"] = st.slider("Annual volatility (%)", 0.0, 40.0, 15.0, step=1.0) / 100
+        elif model_label == "Replay past returns":
+            model = "bootstrap"
+            history_ticker = st.text_input("Replay the monthly returns of", value="VOO").strip().upper()
+            try:
+                params["history"] = tuple(monthly_history(get_close([history_ticker], "5y")))
+            except Exception:
+                params["history"] = ()
+        else:
+            model = "regime"
+            params["bull_return"] = st.slider("Bull market annual return (%)", 0.0, 30.0, 12.0, step=1.0) / 100
+            params["bear_return"] = st.slider("Bear market annual return (%)", -50.0, 0.0, -15.0, step=1.0) / 100
+            params["bear_stay"] = 1 - 1 / (12 * st.slider("Average bear market length (years)", 0.25, 3.0, 0.75, step=0.25))
+
+        if model == "bootstrap" and len(params["history"]) < 12:
+            st.warning(f"Not enough price history for {history_ticker}.")
+        else:
+            result = run_monte_carlo(model, mc_monthly, mc_years * 12, mc_paths, mc_fee / 100, tuple(params.items()))
+            plot_monte_carlo(result.bands, f"{mc_paths:,} Simulated Paths over {mc_years} Years")
+
+            final = result.bands.iloc[-1]
+            st.markdown("#### 💡 Summary")
+            st.markdown(f"- **Total Invested**: ${result.target:,.0f}")
+            st.markdown(f"- **Median Final Value**: ${final['p50']:,.0f}")
+            st.markdown(f"- **Middle 90% of Outcomes**: ${final['p5']:,.0f} to ${final['p95']:,.0f}")
+            st.markdown(f"- **Chance of Ending Below What You Invested**: {result.shortfall_probability:.1%}")
+
+# --- Backtest ---
+STRATEGY_LABELS = {"lump_sum": "Lump Sum", "dca": "Monthly Investing (DCA)", "rebalance": "Rebalance to Target"}
+REBALANCE_LABELS = {"M": "Monthly", "Q": "Quarterly", "Y": "Yearly"}
+
+def backtest_weights(close, portfolio):
+    # Current holdings weighted by their value at the latest close
+    last = close.ffill().iloc[-1]
+    values = [portfolio.get(ticker, 0) * last[ticker] for ticker in close.columns]
+    if not np.nansum(values):
+        return np.ones(len(close.columns))
+    return np.nan_to_num(values)
+
+def plot_backtest(result, title):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=result.equity.index, y=result.equity, mode='lines', name='Portfolio Value', line=dict(color='#4F8EF7', width=3)))
+    fig.add_trace(go.Scatter(x=result.invested.index, y=result.invested, mode='lines', name='Total Invested', line=dict(color='orange', width=2, dash='dot')))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Portfolio Value ($)",
+        plot_bgcolor='white',
+        hovermode='x unified',
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### ⏪ Backtest on Real Prices")
+backtest_section = st.expander("Replay a strategy over past prices", key="backtest_section", on_change="rerun")
+if backtest_section.open:
+    with backtest_section:
+        portfolio = st.session_state.get("portfolio", {})
+        default_tickers = ", ".join(portfolio) if portfolio else "VOO, QQQ"
+        tickers = [t.strip().upper() for t in st.text_input("Tickers (weighted by your current holdings)", value=default_tickers).split(",") if t.strip()]
+        bt_period = st.radio("Period", ["1y", "2y", "5y"], index=2, horizontal=True)
+        strategy = st.radio("Strategy", STRATEGIES, format_func=STRATEGY_LABELS.get, horizontal=True)
+        bt_initial = st.number_input("Starting amount ($)", min_value=0, value=10000, step=1000)
+        bt_monthly = st.number_input("Monthly contribution ($)", min_value=0, value=200, step=50, key="bt_monthly")
+        rebalance = st.radio("Rebalance", list(REBALANCE_LABELS), format_func=REBALANCE_LABELS.get, index=1, horizontal=True)
+
+        close = get_close(tickers, bt_period) if tickers else pd.DataFrame()
+        if close.empty or close.ffill().dropna().empty:
+            st.warning("No overlapping price history for these tickers.")
+        else:
+            weights = backtest_weights(close, portfolio)
+            result = run_backtest(close, weights, strategy, bt_initial, bt_monthly, rebalance)
+            plot_backtest(result, f"{STRATEGY_LABELS[strategy]} over {bt_period}")
+
+            st.markdown("#### 💡 Summary")
+            st.markdown(f"- **Total Invested**: ${result.total_invested:,.0f}")
+            st.markdown(f"- **Final Portfolio Value**: ${result.final_value:,.0f}")
+            st.markdown(f"- **Yearly Growth (CAGR)**: {result.cagr:.2%}")
+            st.markdown(f"- **Volatility**: {result.volatility:.2%}")
+            st.markdown(f"- **Worst Drop (Max Drawdown)**: {result.max_drawdown:.2%}")
+
+            if st.checkbox("Compare every strategy and rebalance schedule"):
+                param_sets = [
+                    {"strategy": s, "initial": bt_initial, "monthly": bt_monthly, "rebalance": r}
+                    for s in STRATEGIES
+                    for r in (REBALANCE_LABELS if s == "rebalance" else ["Q"])
+                ]
+                results = sweep(close, weights, param_sets)
+                st.dataframe(pd.DataFrame({
+                    "Strategy": results["strategy"].map(STRATEGY_LABELS),
+                    "Rebalance": np.where(results["strategy"] == "rebalance", results["rebalance"].map(REBALANCE_LABELS), "-"),
+                    "Final ($)": results["final_value"],
+                    "CAGR": results["cagr"],
+                    "Volatility": results["volatility"],
+                    "Max Drawdown": results["max_drawdown"],
+                }).style.format({
+                    "Final ($)": "${:,.0f}",
+                    "CAGR": "{:.2%}",
+                    "Volatility": "{:.2%}",
+                    "Max Drawdown": "{:.2%}",
+                }), hide_index=True)
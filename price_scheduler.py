@@ -0,0 +1,184 @@
+# price_scheduler.py
+import os
+import threading
+import time
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from quote_feed import feed_from_env
+from quote_service import get_quotes
+from upstream import NotListed
+
+# One background thread per server process polls quotes for every symbol
+# any session is watching and publishes them here. Page reruns only read
+# the latest published prices, so they never wait on Yahoo (except the
+# first time a symbol is seen, when there is nothing to show yet).
+# With a push feed attached, ticks are published as they arrive and the
+# poller only covers symbols the feed hasn't ticked recently.
+POLL_SECONDS = float(os.getenv("PRICE_POLL_SECONDS", 15))
+CLOSED_POLL_SECONDS = float(os.getenv("PRICE_CLOSED_POLL_SECONDS", 900))
+# A symbol stops being polled once no session has asked for it in this long
+WATCH_TTL_SECONDS = float(os.getenv("PRICE_WATCH_TTL_SECONDS", 600))
+# Symbols Yahoo has no data for (rights, units, warrants) are only
+# rechecked this often
+UNLISTED_POLL_SECONDS = float(os.getenv("PRICE_UNLISTED_POLL_SECONDS", 3600))
+
+# Regular US session; exchange holidays are treated as trading days
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+
+def is_crypto(symbol):
+    # Yahoo quotes crypto as pairs like BTC-USD, which trade 24/7
+    return symbol.endswith("-USD")
+
+
+def market_open(now=None):
+    now = now or datetime.now(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def fetch_prices(symbols):
+    quotes = get_quotes(symbols)
+    return {
+        symbol: float(price)
+        for symbol, price in quotes["price"].items()
+        if not pd.isna(price)
+    }
+
+
+class PriceScheduler:
+    def __init__(self, fetch=fetch_prices, poll_seconds=POLL_SECONDS,
+                 closed_poll_seconds=CLOSED_POLL_SECONDS, watch_ttl=WATCH_TTL_SECONDS, feed=None):
+        self.fetch = fetch
+        self.feed = feed
+        self.poll_seconds = poll_seconds
+        self.closed_poll_seconds = closed_poll_seconds
+        self.watch_ttl = watch_ttl
+        self.prices = {}
+        self.fetched_at = {}
+        self.failed = set()
+        self.unlisted = set()
+        self._watched = {}
+        self._polled_at = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="price-scheduler", daemon=True)
+                self._thread.start()
+                if self.feed is not None:
+                    self.feed.start(self.publish)
+
+    def watch(self, symbols):
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                self._watched[symbol] = now
+        self.start()
+        if self.feed is not None:
+            self.feed.subscribe(symbols)
+
+    def read(self, symbols):
+        # Latest published price per symbol, None if there isn't one yet.
+        # Symbols that have never been polled are fetched inline once.
+        symbols = list(dict.fromkeys(symbols))
+        self.watch(symbols)
+        with self._lock:
+            unseen = [s for s in symbols if s not in self._polled_at]
+        if unseen:
+            self.refresh(unseen)
+        with self._lock:
+            return {s: self.prices.get(s) for s in symbols}
+
+    def refresh(self, symbols):
+        now = time.monotonic()
+        try:
+            fetched = self.fetch(symbols)
+            # Yahoo answered for the batch, so a symbol left without a
+            # price is one it has no data for
+            unlisted = set(symbols) - set(fetched) if fetched else set()
+        except NotListed as e:
+            fetched, unlisted = {}, set(e.symbols)
+        except Exception:
+            fetched, unlisted = {}, set()
+        with self._lock:
+            for symbol in symbols:
+                self._polled_at[symbol] = now
+                price = fetched.get(symbol)
+                if price is None:
+                    self.failed.add(symbol)
+                    if symbol in unlisted:
+                        self.unlisted.add(symbol)
+                    continue
+                self.prices[symbol] = price
+                self.fetched_at[symbol] = time.time()
+                self.failed.discard(symbol)
+                self.unlisted.discard(symbol)
+
+    def publish(self, symbol, price, timestamp=None):
+        # Called from the feed thread for every tick
+        with self._lock:
+            self._polled_at[symbol] = time.monotonic()
+            self.prices[symbol] = price
+            self.fetched_at[symbol] = timestamp or time.time()
+            self.failed.discard(symbol)
+            self.unlisted.discard(symbol)
+
+    def _interval(self, symbol, is_open):
+        if symbol in self.unlisted:
+            return UNLISTED_POLL_SECONDS
+        return self.poll_seconds if is_open or is_crypto(symbol) else self.closed_poll_seconds
+
+    def _due(self):
+        now = time.monotonic()
+        is_open = market_open()
+        with self._lock:
+            for symbol, seen in list(self._watched.items()):
+                if now - seen > self.watch_ttl:
+                    del self._watched[symbol]
+            # Symbols that were never polled are left to the inline fetch in read()
+            return [
+                symbol for symbol in self._watched
+                if symbol in self._polled_at
+                and now - self._polled_at[symbol] >= self._interval(symbol, is_open)
+            ]
+
+    def _run(self):
+        while True:
+            due = self._due()
+            if due:
+                self.refresh(due)
+            time.sleep(self.poll_seconds)
+
+    def is_stale(self, symbol):
+        # The latest poll failed but an earlier price is still being served
+        with self._lock:
+            return symbol in self.failed and symbol in self.prices
+
+    def is_unavailable(self, symbol):
+        # Polled, but never priced
+        with self._lock:
+            return symbol in self.failed and symbol not in self.prices
+
+    def age(self, symbol):
+        if symbol not in self.fetched_at:
+            return None
+        return time.time() - self.fetched_at[symbol]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PriceScheduler(feed=feed_from_env())
+        return _scheduler
@@ -0,0 +1,56 @@
+# price_snapshot.py
+import os
+
+import streamlit as st
+
+from price_scheduler import get_scheduler
+
+# How often live widgets rerun while a push feed is streaming ticks
+LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", 0.5))
+
+
+# A session's view of the prices published by the background scheduler.
+# Reading never waits on the network once a symbol has been polled; if the
+# latest poll for a symbol failed, its last price is kept and the symbol is
+# marked stale, so the UI can still show a value and flag it. A symbol that
+# has never been priced is unavailable instead.
+class PriceSnapshot:
+    def __init__(self, source=None):
+        self.source = source or get_scheduler()
+        self.prices = {}
+        # Bumped whenever a served price changes, so cached views can tell
+        # whether they need recomputing
+        self.version = 0
+
+    def get_many(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        for symbol, price in self.source.read(symbols).items():
+            if price is not None and self.prices.get(symbol) != price:
+                self.version += 1
+                self.prices[symbol] = price
+        return {s: self.prices.get(s) for s in symbols}
+
+    def get(self, symbol):
+        return self.get_many([symbol])[symbol]
+
+    def is_stale(self, symbol):
+        return self.source.is_stale(symbol)
+
+    def is_unavailable(self, symbol):
+        return self.source.is_unavailable(symbol)
+
+    def age(self, symbol):
+        return self.source.age(symbol)
+
+
+def live_refresh_interval():
+    # Without a feed prices only change on the poll cadence, so live
+    # widgets just follow the page's normal reruns
+    feed = get_scheduler().feed
+    return LIVE_REFRESH_SECONDS if feed is not None and feed.available else None
+
+
+def get_price_snapshot():
+    if "price_snapshot" not in st.session_state:
+        st.session_state.price_snapshot = PriceSnapshot()
+    return st.session_state.price_snapshot
@@ -0,0 +1,96 @@
+# projection.py
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Monthly balance projections for many what-if scenarios at once. Every
+# parameter may be a scalar or a 1-D array; they are broadcast together and
+# each resulting row is one scenario. Each month the contribution is added,
+# then the month's return (net of fees) is applied, then the crash if one
+# is scheduled for that month:
+#   balance[t] = (balance[t-1] + monthly) * growth[t]
+# crash_month is 1-based; 0 means no crash. crash_percent must be below 1.
+
+
+def _scenarios(**params):
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in params.values()))
+    return dict(zip(params, (a.reshape(-1, 1) for a in arrays)))
+
+
+def growth_factors(months, annual_return=0.07, annual_fee=0.0, crash_month=0, crash_percent=0.0):
+    p = _scenarios(annual_return=annual_return, annual_fee=annual_fee,
+                   crash_month=crash_month, crash_percent=crash_percent)
+    month = np.arange(1, months + 1)
+    growth = np.broadcast_to(1 + (p["annual_return"] - p["annual_fee"]) / 12, (len(p["annual_return"]), months))
+    crash = np.where(month == p["crash_month"], 1 - p["crash_percent"], 1.0)
+    return growth * crash
+
+
+def balance_paths(factors, monthly, initial=0.0):
+    # factors has shape (scenarios, months); monthly and initial are scalars
+    # or (scenarios, 1) columns. Unrolling the recurrence with
+    # P[t] = growth[1] * ... * growth[t]:
+    #   balance[t] = P[t] * (initial + monthly * sum(1 / P[j-1] for j <= t))
+    cumulative = np.cumprod(factors, axis=1)
+    previous = np.hstack([np.ones((len(cumulative), 1)), cumulative[:, :-1]])
+    return cumulative * (initial + monthly * np.cumsum(1 / previous, axis=1))
+
+
+def project(monthly, months, annual_return=0.07, crash_month=0, crash_percent=0.0,
+            inflation=0.0, annual_fee=0.0, initial=0.0, real=False):
+    # Balance paths, shape (scenarios, months). With real=True the values
+    # are deflated to today's dollars.
+    p = _scenarios(monthly=monthly, annual_return=annual_return, crash_month=crash_month,
+                   crash_percent=crash_percent, inflation=inflation, annual_fee=annual_fee, initial=initial)
+    factors = growth_factors(months, p["annual_return"], p["annual_fee"], p["crash_month"], p["crash_percent"])
+    balance = balance_paths(factors, p["monthly"], p["initial"])
+    if real:
+        balance = balance / (1 + p["inflation"] / 12) ** np.arange(1, months + 1)
+    return balance
+
+
+def _annuity(monthly, rate, months):
+    # Value after `months` of contributing then growing at `rate` per month
+    growth = (1 + rate) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.where(rate == 0, months, (1 + rate) * (growth - 1) / rate)
+    return monthly * series, growth
+
+
+def final_balance(monthly, months, annual_return=0.07, crash_month=0, crash_percent=0.0,
+                  inflation=0.0, annual_fee=0.0, initial=0.0, real=False):
+    # Closed-form balance after `months`, one value per scenario, without
+    # building the paths. Matches project(...)[:, -1].
+    p = _scenarios(monthly=monthly, annual_return=annual_return, crash_month=crash_month,
+                   crash_percent=crash_percent, inflation=inflation, annual_fee=annual_fee, initial=initial)
+    p = {k: v.ravel() for k, v in p.items()}
+    rate = (p["annual_return"] - p["annual_fee"]) / 12
+    crashes = (p["crash_month"] >= 1) & (p["crash_month"] <= months)
+    before = np.where(crashes, p["crash_month"], months)
+    saved, growth = _annuity(p["monthly"], rate, before)
+    balance = (p["initial"] * growth + saved) * np.where(crashes, 1 - p["crash_percent"], 1.0)
+    saved, growth = _annuity(p["monthly"], rate, months - before)
+    balance = balance * growth + saved
+    if real:
+        balance = balance / (1 + p["inflation"] / 12) ** months
+    return balance
+
+
+def scenario_grid(**params):
+    # Every combination of the given parameter values, one row per scenario
+    names = list(params)
+    values = [np.atleast_1d(params[name]) for name in names]
+    return pd.DataFrame(list(itertools.product(*values)), columns=names)
+
+
+def compare(grid, months):
+    # Adds invested, final and real final value columns to a scenario grid
+    columns = {name: grid[name].to_numpy() for name in grid}
+    initial = columns.get("initial", 0.0)
+    result = grid.copy()
+    result["invested"] = initial + columns["monthly"] * months
+    result["final"] = final_balance(months=months, **columns)
+    result["final_real"] = final_balance(months=months, real=True, **columns)
+    result["gain"] = result["final"] - result["invested"]
+    return result
@@ -0,0 +1,162 @@
+# quote_feed.py
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+# Push-based price sources. A feed calls on_tick(symbol, price, timestamp)
+# for every trade it receives; the price scheduler publishes those ticks
+# straight into the shared prices, and keeps polling only for symbols the
+# feed doesn't cover. Pick one with QUOTE_FEED:
+#   QUOTE_FEED=replay:data/ticks.csv   replay recorded ticks from a CSV file
+#   QUOTE_FEED=finnhub                 Finnhub trades websocket (FINNHUB_API_KEY)
+QUOTE_FEED = os.getenv("QUOTE_FEED", "")
+REPLAY_SPEED = float(os.getenv("QUOTE_REPLAY_SPEED", 1))
+FINNHUB_WS_URL = "wss://ws.finnhub.io"
+RECONNECT_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteFeed(ABC):
+    def __init__(self):
+        self.symbols = set()
+        self.on_tick = None
+        # False once the feed knows it can't deliver ticks (e.g. a missing
+        # dependency); live widgets then stop refreshing on their own
+        self.available = True
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, symbols):
+        self.symbols.update(symbols)
+
+    def start(self, on_tick):
+        self.on_tick = on_tick
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @abstractmethod
+    def _run(self):
+        ...
+
+
+class ReplayFeed(QuoteFeed):
+    # Replays a CSV of timestamp,symbol,price rows, keeping the recorded
+    # gaps between ticks (divided by speed). Useful offline and in tests.
+    def __init__(self, path, speed=REPLAY_SPEED, loop=True):
+        super().__init__()
+        ticks = pd.read_csv(path)
+        ticks["timestamp"] = pd.to_datetime(ticks["timestamp"], utc=True, format="ISO8601")
+        ticks = ticks.sort_values("timestamp", kind="stable")
+        self.times = ticks["timestamp"].astype("int64").to_numpy() / 1e9
+        self.rows = list(zip(ticks["symbol"], ticks["price"].astype(float)))
+        self.speed = speed
+        self.loop = loop
+        if not self.rows:
+            logger.warning("Quote replay file %s has no ticks", path)
+            self.available = False
+
+    def _run(self):
+        if not self.rows:
+            return
+        while not self._stop.is_set():
+            started = time.monotonic()
+            for offset, (symbol, price) in zip(self.times - self.times[0], self.rows):
+                delay = started + offset / self.speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                if symbol in self.symbols:
+                    self.on_tick(symbol, price, time.time())
+            if not self.loop:
+                return
+
+
+def to_finnhub(symbol):
+    # Yahoo's BTC-USD is BINANCE:BTCUSDT on Finnhub; stocks keep their symbol
+    if symbol.endswith("-USD"):
+        return f"BINANCE:{symbol[:-4]}USDT"
+    return symbol
+
+
+def from_finnhub(symbol):
+    if symbol.startswith("BINANCE:") and symbol.endswith("USDT"):
+        return symbol[len("BINANCE:"):-4] + "-USD"
+    return symbol
+
+
+class FinnhubFeed(QuoteFeed):
+    def __init__(self, token, url=FINNHUB_WS_URL):
+        super().__init__()
+        self.url = f"{url}?token={token}"
+        self._sent = set()
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, symbols):
+        with self._lock:
+            super().subscribe(symbols)
+            if self._socket is not None:
+                self._send_subscriptions()
+
+    def _send_subscriptions(self):
+        for symbol in self.symbols - self._sent:
+            self._socket.send(json.dumps({"type": "subscribe", "symbol": to_finnhub(symbol)}))
+            self._sent.add(symbol)
+
+    def _run(self):
+        try:
+            from websockets.sync.client import connect
+        except ImportError:
+            logger.error("QUOTE_FEED=finnhub needs the websockets package, falling back to polling")
+            self.available = False
+            return
+
+        while not self._stop.is_set():
+            try:
+                with connect(self.url) as socket:
+                    with self._lock:
+                        self._socket = socket
+                        self._sent = set()
+                        self._send_subscriptions()
+                    for message in socket:
+                        if self._stop.is_set():
+                            return
+                        self._handle(json.loads(message))
+            except Exception as e:
+                logger.warning("Quote feed disconnected: %s", e)
+            finally:
+                with self._lock:
+                    self._socket = None
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _handle(self, message):
+        if message.get("type") != "trade":
+            return
+        # A message can batch several trades; only the latest per symbol matters
+        latest = {}
+        for trade in message.get("data", []):
+            latest[from_finnhub(trade["s"])] = (float(trade["p"]), trade["t"] / 1000)
+        for symbol, (price, timestamp) in latest.items():
+            self.on_tick(symbol, price, timestamp)
+
+
+def feed_from_env(spec=QUOTE_FEED):
+    if spec.startswith("replay:"):
+        return ReplayFeed(spec[len("replay:"):])
+    if spec == "finnhub":
+        token = os.getenv("FINNHUB_API_KEY")
+        if not token:
+            logger.warning("QUOTE_FEED=finnhub needs FINNHUB_API_KEY, falling back to polling")
+            return None
+        return FinnhubFeed(token)
+    return None
@@ -0,0 +1,104 @@
+# quote_service.py
+import numpy as np
+import pandas as pd
+
+from market_cache import cache
+from upstream import NoData, NotListed, get_upstream
+
+# Quotes are cached process-wide, per symbol
+QUOTE_TTL_SECONDS = 15
+# Per-ticker yfinance errors that mean Yahoo itself is struggling
+TRANSIENT_ERRORS = ("RateLimit", "Too Many Requests", "Timeout", "timed out", "Connection")
+
+
+def _download(symbols, **kwargs):
+    import yfinance as yf
+    from yfinance import shared
+
+    data = yf.download(symbols, **kwargs)
+    if not data.empty and not data.isna().all().all():
+        return data
+    # yfinance reports failed tickers as missing data rather than raising.
+    # Releases that keep the per-ticker reasons in shared._ERRORS tell us
+    # whether Yahoo was failing; without them, one symbol coming back empty
+    # is taken to mean Yahoo doesn't list it, since a single unlisted pick
+    # must not open the breaker for every session.
+    errors = [str(getattr(shared, "_ERRORS", {}).get(s.upper(), "")) for s in symbols]
+    transient = any(marker in error for error in errors for marker in TRANSIENT_ERRORS)
+    if not transient and (len(symbols) == 1 or all(errors)):
+        raise NotListed(f"Yahoo has no prices for {', '.join(symbols)}", symbols)
+    raise NoData(f"Yahoo returned no prices for {', '.join(symbols)}")
+
+
+def download(symbols, **kwargs):
+    # One bulk request for every symbol. Columns are always (field, symbol),
+    # even for a single symbol, so callers can index by field the same way.
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame()
+    yahoo = get_upstream("yahoo")
+    data = yahoo.call(
+        _download,
+        symbols,
+        group_by="column",
+        auto_adjust=True,
+        progress=False,
+        threads=True,
+        timeout=yahoo.timeout,
+        **kwargs
+    )
+    if not isinstance(data.columns, pd.MultiIndex):
+        data.columns = pd.MultiIndex.from_product([data.columns, symbols])
+    return data
+
+
+def fetch_history(symbols, period="1mo", field="Close"):
+    symbols = list(dict.fromkeys(symbols))
+    data = download(symbols, period=period)
+    if data.empty or field not in data.columns.get_level_values(0):
+        return pd.DataFrame(columns=symbols, dtype=float)
+    return data[field].reindex(columns=symbols)
+
+
+def _last_valid(close, offset):
+    values = close.to_numpy(dtype=float)
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    result = np.full(values.shape[1], np.nan)
+    for i in np.flatnonzero(counts >= offset):
+        column = values[:, i]
+        result[i] = column[~np.isnan(column)][-offset]
+    return result
+
+
+def _fetch_quotes(symbols):
+    # A 5 day window covers weekends/holidays for stocks; crypto trades daily.
+    close = fetch_history(symbols, period="5d")
+    if close.empty:
+        price = previous = np.full(len(symbols), np.nan)
+    else:
+        price = _last_valid(close, 1)
+        previous = _last_valid(close, 2)
+    return {
+        ("quote", symbol): {"price": price[i], "previous_close": previous[i]}
+        for i, symbol in enumerate(symbols)
+    }
+
+
+def get_quotes(symbols):
+    # Latest price, previous close and % change per symbol, indexed by symbol.
+    # Only symbols missing from the shared cache are fetched, in one request.
+    symbols = list(dict.fromkeys(symbols))
+    cached = cache.get_many_or_fetch(
+        [("quote", symbol) for symbol in symbols],
+        lambda keys: _fetch_quotes([key[1] for key in keys]),
+        ttl=QUOTE_TTL_SECONDS,
+    )
+    quotes = pd.DataFrame(
+        [cached.get(("quote", symbol), {}) for symbol in symbols],
+        index=pd.Index(symbols, name="symbol"),
+        columns=["price", "previous_close"],
+        dtype=float,
+    )
+    quotes["change_pct"] = (quotes["price"] / quotes["previous_close"] - 1) * 100
+    return quotes
+
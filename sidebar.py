@@ -1,10 +1,15 @@
 # sidebar.py
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import streamlit as st
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import yfinance as yf
-import finnhub
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from history_store import get_close, get_history
+from fundamentals import get_fundamentals
+from news_service import get_market_news
+from quote_service import get_quotes
+from trending_service import get_trending_symbols
 
 # Predefined sector tickers for growth comparison
 SECTOR_TICKERS = {
@@ -15,69 +20,115 @@ SECTOR_TICKERS = {
     "Crypto": ["BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "XRP-USD"]
 }
 
+# Sidebar fetches run concurrently on a shared, bounded pool, all under one
+# deadline so a slow upstream can't hold up the first paint for longer
+SIDEBAR_WORKERS = 8
+FETCH_TIMEOUT_SECONDS = 5
+_executor = ThreadPoolExecutor(max_workers=SIDEBAR_WORKERS, thread_name_prefix="sidebar")
+
+def rank_gainers(close, tickers, limit=5):
+    first = close.bfill().iloc[0]
+    last = close.ffill().iloc[-1]
+    growth = ((last - first) / first * 100)[close.count() >= 2]
+    top = growth.reindex(tickers).dropna().sort_values(ascending=False).head(limit)
+    return [(ticker, round(float(g), 2), round(float(last[ticker]), 2)) for ticker, g in top.items()]
+
 @st.cache_data(ttl=3600)
-def get_top_gainers(tickers, period="3mo"):
-    stock_data = []
-    for ticker in tickers:
-        try:
-            data = yf.Ticker(ticker).history(period=period)
-            price = data["Close"][-1] if not data.empty else None
-            if len(data) >= 2:
-                growth = (data["Close"][-1] - data["Close"][0]) / data["Close"][0]
-                stock_data.append((ticker, round(growth * 100, 2), round(price, 2) if price else None))
-        except:
-            continue
-    return sorted(stock_data, key=lambda x: x[1], reverse=True)[:5]
+def get_sector_gainers(period="3mo"):
+    # One history lookup for every sector, ranked per sector afterwards
+    all_tickers = [t for tickers in SECTOR_TICKERS.values() for t in tickers]
+    try:
+        close = get_close(all_tickers, period=period)
+        return {sector: rank_gainers(close, tickers) for sector, tickers in SECTOR_TICKERS.items()}
+    except Exception:
+        return {sector: [] for sector in SECTOR_TICKERS}
 
 # Trending stocks helper functions
-def fetch_trending_stocks(limit=5):
-    url = "https://finance.yahoo.com/trending-tickers"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-        table = soup.find("table")
-        df = pd.read_html(str(table))[0]
-        return df["Symbol"].head(limit).tolist()
-    except:
-        return []
-
-def get_stock_info(symbol):
+def get_stock_info(symbol, price=None):
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = get_fundamentals(symbol)
         return {
             "symbol": symbol,
             "name": info.get("shortName", "N/A"),
-            "price": info.get("regularMarketPrice", None),
+            "price": price,
             "sector": info.get("sector", "N/A"),
         }
-    except:
+    except Exception:
         return None
 
 def display_stock_popup(ticker):
-    info = get_stock_info(ticker)
+    try:
+        price = get_quotes([ticker])["price"].dropna().get(ticker)
+    except Exception:
+        price = None
+    info = get_stock_info(ticker, price)
     if info:
         with st.expander(f"📈 Investment Info: {info['symbol']}"):
             st.write(f"**Name:** {info['name']}")
             st.write(f"**Price:** ${info['price']:.2f}" if info['price'] else "**Price:** N/A")
             st.write(f"**Sector:** {info['sector']}")
             try:
-                hist = yf.Ticker(ticker).history(period="6mo")
+                hist = get_history(ticker, period="6mo")
                 if not hist.empty:
-                    pct_change = ((hist["Close"][-1] - hist["Close"][0]) / hist["Close"][0]) * 100
+                    pct_change = ((hist["Close"].iloc[-1] - hist["Close"].iloc[0]) / hist["Close"].iloc[0]) * 100
                     st.write(f"**6-Month Change:** {pct_change:.2f}%")
                     st.line_chart(hist["Close"], use_container_width=True)
                 else:
                     st.write("No historical data available.")
-            except:
+            except Exception:
                 st.write("Historical data could not be fetched.")
 
+def fetch_trending_prices(symbols):
+    return get_quotes(symbols)["price"].dropna().to_dict()
+
+def submit_fetch(fn, *args):
+    # Workers only do I/O. The run context is attached so cached helpers
+    # behave the same as on the script thread.
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return _executor.submit(run)
+
+def render_gainers(slot, sector, gainers):
+    with slot.container():
+        if gainers is None:
+            st.caption("Top gainers are unavailable right now.")
+            return
+        for ticker, growth, price in gainers[sector]:
+            if st.button(f"{ticker}: {growth}% | ${price if price else 'N/A'}", key=f"{sector}_{ticker}"):
+                display_stock_popup(ticker)
+
+def render_trending_row(slot, symbol, info):
+    with slot.container():
+        if info:
+            if info["price"]:
+                st.subheader(f"{info['symbol']} – ${info['price']:.2f}")
+            else:
+                st.subheader(f"{info['symbol']}")
+            st.caption(f"**{info['name']}** ({info['sector']})")
+        else:
+            st.error(f"{symbol} info not available.")
+        st.markdown("---")
+
+def render_news(slot, news):
+    with slot.container():
+        if news is None:
+            st.warning("Could not fetch news right now.")
+            return
+        st.header("📰 Stock Market News")
+        for article in news:
+            st.markdown(f"**[{article['headline']}]({article['url']})**")
+            st.caption(article['summary'][:100] + "...")
+
 # Sidebar layout
 def render_sidebar():
     with st.sidebar:
         st.header("📘 Learn the Basics")
 
+        gainer_slots = {}
         for sector in SECTOR_TICKERS:
             with st.expander(f"{get_sector_icon(sector)} {sector}"):
                 if sector == "Tech":
@@ -91,38 +142,67 @@ def render_sidebar():
                 elif sector == "Crypto":
                     st.markdown("Digital assets like Bitcoin (BTC) and Ethereum (ETH). Highly volatile!")
 
-                gainers = get_top_gainers(SECTOR_TICKERS[sector])
                 st.markdown("**Top Gainers (Last 3 Months):**")
-                for ticker, growth, price in gainers:
-                    if st.button(f"{ticker}: {growth}% | ${price if price else 'N/A'}", key=f"{sector}_{ticker}"):
-                        display_stock_popup(ticker)
+                gainer_slots[sector] = st.empty()
+                gainer_slots[sector].caption("Top gainers are still loading.")
 
         st.markdown("---")
 
         st.header("🔥 Trending Stocks")
-        trending_tickers = fetch_trending_stocks()
+        trending_slot = st.container()
+        news_slot = st.empty()
 
-        for symbol in trending_tickers:
-            info = get_stock_info(symbol)
-            if info:
-                if info["price"]:
-                    st.subheader(f"{info['symbol']} – ${info['price']:.2f}")
-                else:
-                    st.subheader(f"{info['symbol']}")
-                st.caption(f"**{info['name']}** ({info['sector']})")
-            else:
-                st.error(f"{symbol} info not available.")
-            st.markdown("---")
-
-        try:
-            finnhub_client = finnhub.Client(api_key="d1vsb5pr01qmbi8pt1cgd1vsb5pr01qmbi8pt1d0")
-            news = finnhub_client.general_news('general', min_id=0)
-            st.header("📰 Stock Market News")
-            for article in news[:5]:
-                st.markdown(f"**[{article['headline']}]({article['url']})**")
-                st.caption(article['summary'][:100] + "...")
-        except:
-            st.warning("Could not fetch news right now.")
+    # Fan out every fetch at once and render each section as soon as its
+    # data arrives. Anything unfinished at the deadline (shared by the
+    # follow-up fetches too) is rendered as unavailable.
+    tasks = {}
+    deadline = time.monotonic() + FETCH_TIMEOUT_SECONDS
+
+    def schedule(kind, symbol, fn, *args):
+        future = submit_fetch(fn, *args)
+        tasks[future] = (kind, symbol)
+
+    schedule("gainers", None, get_sector_gainers)
+    schedule("trending", None, get_trending_symbols)
+    schedule("news", None, get_market_news)
+    trending_rows = {}
+    trending_info = {}
+    trending_prices = None
+
+    while tasks:
+        timeout = max(0, deadline - time.monotonic())
+        done, _ = wait(tasks, timeout=timeout, return_when=FIRST_COMPLETED)
+        expired = [f for f in tasks if f not in done] if time.monotonic() >= deadline else []
+
+        for future in [*done, *expired]:
+            kind, symbol = tasks.pop(future)
+            result = None
+            if future in done and future.exception() is None:
+                result = future.result()
+
+            if kind == "gainers":
+                for sector, slot in gainer_slots.items():
+                    render_gainers(slot, sector, result)
+            elif kind == "news":
+                render_news(news_slot, result)
+            elif kind == "trending":
+                for trending_symbol in result or []:
+                    trending_rows[trending_symbol] = trending_slot.empty()
+                    schedule("info", trending_symbol, get_stock_info, trending_symbol)
+                if result:
+                    schedule("prices", None, fetch_trending_prices, result)
+            elif kind == "prices":
+                trending_prices = result or {}
+                for trending_symbol, info in trending_info.items():
+                    if info:
+                        info["price"] = trending_prices.get(trending_symbol, info["price"])
+                    render_trending_row(trending_rows[trending_symbol], trending_symbol, info)
+            elif kind == "info":
+                trending_info[symbol] = result
+                if trending_prices is not None:
+                    if result:
+                        result["price"] = trending_prices.get(symbol, result["price"])
+                    render_trending_row(trending_rows[symbol], symbol, result)
 
 def get_sector_icon(sector):
     return {
@@ -0,0 +1,201 @@
+# storage.py
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import streamlit as st
+
+from value_log import ValueLog
+
+# Accounts are stored as an append-only event journal (Buy/Sell
+# transactions and portfolio value points) plus periodic state snapshots.
+# Loading reads the latest snapshot and replays only the events after it.
+# Snapshots are folded from the journal itself, never from a session's
+# in-memory state, so events journaled by other sessions are kept.
+DB_PATH = os.getenv("ACCOUNTS_DB", os.path.join("data", "accounts.db"))
+# Importing the old whole-document save file is opt-in: set this to its
+# path (e.g. saved_portfolio.json) to load it into the default account
+LEGACY_SNAPSHOT_PATH = os.getenv("LEGACY_PORTFOLIO_JSON")
+DEFAULT_ACCOUNT = "default"
+STARTING_CASH = 100000
+SNAPSHOT_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_account ON events (account, id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    account TEXT PRIMARY KEY,
+    last_event_id INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+def new_state():
+    return {
+        "cash_balance": STARTING_CASH,
+        "portfolio": {},
+        "history": [],
+        "portfolio_value_log": ValueLog(),
+    }
+
+
+def apply_event(state, kind, payload):
+    # Works on a plain dict or on st.session_state
+    if kind == "txn":
+        asset = payload["asset"]
+        portfolio = state["portfolio"]
+        if payload["action"] == "Buy":
+            state["cash_balance"] -= payload["total"]
+            portfolio[asset] = portfolio.get(asset, 0) + payload["shares"]
+        else:
+            state["cash_balance"] += payload["total"]
+            portfolio[asset] = round(portfolio.get(asset, 0) - payload["shares"], 6)
+            if portfolio[asset] <= 0:
+                del portfolio[asset]
+        state["history"].append(payload)
+    elif kind == "value":
+        state["portfolio_value_log"].append(payload)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ValueLog):
+        return value.to_dict()
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _decode_txn(txn):
+    if isinstance(txn.get("date"), str):
+        txn["date"] = datetime.fromisoformat(txn["date"])
+    return txn
+
+
+def _to_json(state):
+    return json.dumps({key: state[key] for key in new_state()}, default=_encode)
+
+
+def _from_json(text):
+    state = new_state()
+    state.update(json.loads(text))
+    state["history"] = [_decode_txn(txn) for txn in state["history"]]
+    log = state["portfolio_value_log"]
+    # Older save files store the value log as a plain list of points
+    state["portfolio_value_log"] = ValueLog.from_dict(log) if isinstance(log, dict) else ValueLog.from_points(log)
+    return state
+
+
+class AccountStore:
+    def __init__(self, path=DB_PATH, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self._local = threading.local()
+        self._since_snapshot = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        # One connection per thread; WAL lets sessions read while one writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _fold(self, conn, account, until=None):
+        # Latest snapshot plus the journal after it (up to event `until`).
+        # Returns (state or None, last event id, events replayed).
+        row = conn.execute(
+            "SELECT last_event_id, state FROM snapshots WHERE account = ?", (account,)
+        ).fetchone()
+        last_event_id, state = (row[0], _from_json(row[1])) if row else (0, None)
+
+        events = conn.execute(
+            "SELECT id, kind, payload FROM events WHERE account = ? AND id > ? AND id <= ? ORDER BY id",
+            (account, last_event_id, until if until is not None else 2**63 - 1),
+        ).fetchall()
+        if state is None and not events:
+            return None, last_event_id, 0
+        state = state or new_state()
+        for event_id, kind, payload in events:
+            payload = json.loads(payload)
+            apply_event(state, kind, _decode_txn(payload) if kind == "txn" else payload)
+            last_event_id = event_id
+        return state, last_event_id, len(events)
+
+    def _write_snapshot(self, conn, account, state, last_event_id):
+        # A snapshot never replaces a newer one written by another session
+        conn.execute(
+            "INSERT INTO snapshots (account, last_event_id, state) VALUES (?, ?, ?) "
+            "ON CONFLICT (account) DO UPDATE SET last_event_id = excluded.last_event_id, state = excluded.state "
+            "WHERE excluded.last_event_id >= snapshots.last_event_id",
+            (account, last_event_id, _to_json(state)),
+        )
+
+    def load(self, account):
+        state, _, replayed = self._fold(self._conn(), account)
+        self._since_snapshot[account] = replayed
+        return state
+
+    def append(self, account, kind, payload):
+        conn = self._conn()
+        with conn:
+            event_id = conn.execute(
+                "INSERT INTO events (account, kind, payload) VALUES (?, ?, ?)",
+                (account, kind, json.dumps(payload, default=_encode)),
+            ).lastrowid
+        pending = self._since_snapshot.get(account, 0) + 1
+        self._since_snapshot[account] = pending
+        if pending >= self.snapshot_every:
+            self.snapshot(account, event_id)
+        return event_id
+
+    def snapshot(self, account, last_event_id=None):
+        conn = self._conn()
+        with conn:
+            state, last_event_id, _ = self._fold(conn, account, last_event_id)
+            if state is not None:
+                self._write_snapshot(conn, account, state, last_event_id)
+        self._since_snapshot[account] = 0
+
+    def import_state(self, account, state):
+        # Replaces the account with `state`, as of the end of its journal
+        conn = self._conn()
+        with conn:
+            last_event_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM events WHERE account = ?", (account,)
+            ).fetchone()[0]
+            conn.execute("DELETE FROM snapshots WHERE account = ?", (account,))
+            self._write_snapshot(conn, account, state, last_event_id)
+        self._since_snapshot[account] = 0
+
+    def import_json(self, account, path):
+        with open(path) as f:
+            self.import_state(account, _from_json(f.read()))
+
+
+@st.cache_resource
+def get_store():
+    return AccountStore()
+
+
+def load_account(account):
+    store = get_store()
+    state = store.load(account)
+    if state is None and account == DEFAULT_ACCOUNT and LEGACY_SNAPSHOT_PATH:
+        # One-time migration of the old whole-document save file
+        store.import_json(account, LEGACY_SNAPSHOT_PATH)
+        state = store.load(account)
+    return state or new_state()
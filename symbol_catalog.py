@@ -0,0 +1,98 @@
+# symbol_catalog.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CATALOG_PATH = "extended_nasdaq_symbols.csv"
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Symbols sorted once per process, with a trigram index over
+# "symbol company name" for type-ahead search.
+class SymbolCatalog:
+    def __init__(self, df):
+        df = df.dropna(subset=["Symbol", "Company Name"])
+        df = df.drop_duplicates("Symbol").sort_values("Symbol")
+        self.symbols = df["Symbol"].astype(str).str.upper().to_numpy(dtype=str)
+        self.names = df["Company Name"].astype(str).to_numpy(dtype=str)
+        self.etf = ((df["ETF"] == "Y") | (df["Category"] == "ETF")).to_numpy()
+        self.test_issue = (df["Test Issue"] == "Y").to_numpy()
+        self.market_category = df["Market Category"].fillna("").astype(str).to_numpy(dtype=str)
+        self._text = np.char.lower(np.char.add(np.char.add(self.symbols, " "), self.names))
+        self._lower_names = np.char.lower(self.names)
+
+        postings = {}
+        for row, text in enumerate(self._text):
+            for gram in _trigrams(text):
+                postings.setdefault(gram, []).append(row)
+        self._index = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self._last = ("", None)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def label(self, row):
+        return f"{self.symbols[row]} - {self.names[row]}"
+
+    def _filter_mask(self, etf, test_issue, market_category):
+        mask = np.ones(len(self.symbols), dtype=bool)
+        if etf is not None:
+            mask &= self.etf == etf
+        if test_issue is not None:
+            mask &= self.test_issue == test_issue
+        if market_category:
+            mask &= np.isin(self.market_category, list(market_category))
+        return mask
+
+    def _substring_rows(self, query):
+        # Typing usually extends the previous query, so only its matches
+        # need checking again
+        last_query, last_rows = self._last
+        if last_query and query.startswith(last_query):
+            rows = last_rows
+        elif len(query) >= 3:
+            postings = sorted((self._index.get(g) for g in _trigrams(query)), key=lambda p: 0 if p is None else len(p))
+            if postings[0] is None:
+                rows = np.array([], dtype=np.int32)
+            else:
+                rows = postings[0]
+                for posting in postings[1:]:
+                    rows = np.intersect1d(rows, posting, assume_unique=True)
+        else:
+            rows = np.arange(len(self.symbols), dtype=np.int32)
+        rows = rows[np.char.find(self._text[rows], query) >= 0]
+        self._last = (query, rows)
+        return rows
+
+    def search(self, query, limit=20, etf=None, test_issue=None, market_category=None):
+        mask = self._filter_mask(etf, test_issue, market_category)
+        query = query.strip()
+        if not query:
+            return np.flatnonzero(mask)[:limit]
+
+        upper = query.upper()
+        lo = np.searchsorted(self.symbols, upper, side="left")
+        hi = np.searchsorted(self.symbols, upper + "\uffff", side="left")
+        symbol_prefix = np.arange(lo, hi)
+
+        lowered = query.lower()
+        matches = self._substring_rows(lowered)
+        name_prefix = matches[np.char.startswith(self._lower_names[matches], lowered)]
+
+        # Ranking: symbol prefix (exact symbol first), then company name
+        # prefix, then any other substring match
+        ranked = np.concatenate([symbol_prefix, name_prefix, matches])
+        _, first = np.unique(ranked, return_index=True)
+        ranked = ranked[np.sort(first)]
+        return ranked[mask[ranked]][:limit]
+
+    def search_labels(self, query, limit=20, **filters):
+        return [self.label(row) for row in self.search(query, limit, **filters)]
+
+
+@st.cache_resource
+def get_catalog(path=CATALOG_PATH):
+    return SymbolCatalog(pd.read_csv(path))
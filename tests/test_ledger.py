@@ -0,0 +1,90 @@
+# tests/test_ledger.py
+from datetime import datetime
+
+import pytest
+
+from ledger import Ledger
+
+
+def txn(action, asset, shares, price):
+    return {
+        "date": datetime(2024, 1, 2),
+        "action": action,
+        "asset": asset,
+        "shares": shares,
+        "price": price,
+        "total": shares * price,
+    }
+
+
+HISTORY = [
+    txn("Buy", "AAPL", 10, 100.0),
+    txn("Buy", "MSFT", 5, 300.0),
+    txn("Buy", "AAPL", 10, 200.0),
+    txn("Sell", "AAPL", 15, 250.0),
+    txn("Sell", "MSFT", 5, 310.0),
+]
+
+
+def test_average_cost():
+    ledger = Ledger.from_history(HISTORY)
+    aapl = ledger.position("AAPL")
+    # 20 shares at an average of 150; selling 15 removes 15 * 150 of cost
+    assert aapl.shares == pytest.approx(5)
+    assert aapl.cost_basis == pytest.approx(750)
+    assert aapl.average_price == pytest.approx(150)
+    assert aapl.realized_pnl == pytest.approx(15 * 250 - 15 * 150)
+
+
+def test_fifo_cost():
+    ledger = Ledger.from_history(HISTORY, method="fifo")
+    aapl = ledger.position("AAPL")
+    # The first lot (10 at 100) goes first, then 5 from the lot at 200
+    assert aapl.shares == pytest.approx(5)
+    assert aapl.cost_basis == pytest.approx(1000)
+    assert aapl.realized_pnl == pytest.approx(15 * 250 - (10 * 100 + 5 * 200))
+    assert [list(lot) for lot in aapl.lots] == [[5, 200.0]]
+
+
+@pytest.mark.parametrize("method", ["average", "fifo"])
+def test_closed_position_drops_out_of_cost_basis(method):
+    ledger = Ledger.from_history(HISTORY, method=method)
+    msft = ledger.position("MSFT")
+    assert msft.shares == 0
+    assert msft.cost_basis == 0
+    assert msft.realized_pnl == pytest.approx(50)
+    assert set(ledger.cost_basis()) == {"AAPL"}
+
+
+@pytest.mark.parametrize("method", ["average", "fifo"])
+def test_selling_more_than_held_only_sells_what_is_held(method):
+    ledger = Ledger.from_history([txn("Buy", "KO", 2, 50.0), txn("Sell", "KO", 5, 60.0)], method=method)
+    position = ledger.position("KO")
+    assert position.shares == 0
+    assert position.realized_pnl == pytest.approx(2 * 10)
+
+
+def test_selling_without_a_position_is_recorded_but_ignored():
+    ledger = Ledger.from_history([txn("Sell", "KO", 1, 60.0)])
+    assert ledger.position("KO").realized_pnl == 0
+    assert ledger.count == 1
+
+
+def test_incremental_records_match_a_rebuild():
+    ledger = Ledger()
+    for entry in HISTORY:
+        ledger.record(entry)
+    rebuilt = Ledger.from_history(HISTORY)
+    assert ledger.cost_basis() == pytest.approx(rebuilt.cost_basis())
+    assert ledger.count == rebuilt.count == len(HISTORY)
+
+
+def test_transactions_per_asset():
+    ledger = Ledger.from_history(HISTORY)
+    assert ledger.transactions("AAPL", HISTORY) == [HISTORY[0], HISTORY[2], HISTORY[3]]
+    assert ledger.transactions("TSLA", HISTORY) == []
+
+
+def test_unknown_cost_method():
+    with pytest.raises(ValueError):
+        Ledger(method="lifo")
@@ -0,0 +1,104 @@
+# tests/test_market_cache.py
+import threading
+import time
+
+from market_cache import MarketDataCache
+
+
+def run_together(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def slow_fetch(calls, value, delay=0.2):
+    def fetch():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return fetch
+
+
+def test_entries_expire_after_their_ttl():
+    cache = MarketDataCache()
+    cache.set("a", 1, ttl=0.05)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.info()["expirations"] == 1
+
+
+def test_least_recently_used_is_evicted_past_max_bytes():
+    cache = MarketDataCache(max_bytes=3000)
+    cache.set("a", "x" * 1000)
+    cache.set("b", "x" * 1000)
+    cache.get("a")
+    cache.set("c", "x" * 1000)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.bytes <= 3000
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = MarketDataCache()
+    calls, results = [], []
+    fetch = slow_fetch(calls, 42)
+    run_together(5, lambda: results.append(cache.get_or_fetch("a", fetch)))
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert cache.info()["coalesced"] == 4
+    assert cache.get("a") == 42
+
+
+def test_batch_fetch_only_asks_for_missing_keys():
+    cache = MarketDataCache()
+    cache.set("a", 1)
+    asked = []
+
+    def fetch_many(keys):
+        asked.append(list(keys))
+        return {key: key.upper() for key in keys}
+
+    assert cache.get_many_or_fetch(["a", "b", "c"], fetch_many) == {"a": 1, "b": "B", "c": "C"}
+    assert asked == [["b", "c"]]
+
+
+def test_waiters_see_the_fetch_error():
+    cache = MarketDataCache()
+    errors = []
+
+    def fetch():
+        time.sleep(0.2)
+        raise RuntimeError("down")
+
+    def call():
+        try:
+            cache.get_or_fetch("a", fetch)
+        except RuntimeError as e:
+            errors.append(e)
+
+    run_together(3, call)
+    assert len(errors) == 3
+    assert len(cache) == 0
+    assert not cache._inflight
+
+
+def test_coalesce_shares_one_fetch_and_stores_nothing():
+    cache = MarketDataCache()
+    calls, results = [], []
+    fetch = slow_fetch(calls, {"summary": "x" * 1000})
+    run_together(4, lambda: results.append(cache.coalesce("a", fetch)))
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+
+def test_clear():
+    cache = MarketDataCache()
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.bytes == 0
@@ -0,0 +1,110 @@
+# tests/test_storage.py
+from datetime import datetime
+
+import pytest
+
+from storage import STARTING_CASH, AccountStore, apply_event, new_state
+
+
+def txn(action, asset, shares, price, day=2):
+    return {
+        "date": datetime(2024, 1, day),
+        "action": action,
+        "asset": asset,
+        "shares": shares,
+        "price": price,
+        "total": shares * price,
+    }
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "accounts.db")
+
+
+def snapshot_row(store, account):
+    return store._conn().execute(
+        "SELECT last_event_id FROM snapshots WHERE account = ?", (account,)
+    ).fetchone()
+
+
+def test_unknown_account_loads_as_none(path):
+    assert AccountStore(path).load("nobody") is None
+
+
+def test_journal_replays_into_state(path):
+    store = AccountStore(path)
+    store.append("a", "txn", txn("Buy", "AAPL", 2, 100.0))
+    store.append("a", "txn", txn("Sell", "AAPL", 1, 150.0, day=3))
+    store.append("a", "value", {"date": "2024-01-03T00:00:00", "value": 100150.0})
+
+    state = AccountStore(path).load("a")
+    assert state["cash_balance"] == pytest.approx(STARTING_CASH - 200 + 150)
+    assert state["portfolio"] == {"AAPL": 1}
+    assert [entry["action"] for entry in state["history"]] == ["Buy", "Sell"]
+    assert state["history"][0]["date"] == datetime(2024, 1, 2)
+    assert len(state["portfolio_value_log"]) == 1
+
+
+def test_selling_everything_removes_the_position(path):
+    store = AccountStore(path)
+    store.append("a", "txn", txn("Buy", "KO", 3, 50.0))
+    store.append("a", "txn", txn("Sell", "KO", 3, 55.0))
+    assert AccountStore(path).load("a")["portfolio"] == {}
+
+
+def test_snapshot_after_snapshot_every_events(path):
+    store = AccountStore(path, snapshot_every=3)
+    ids = [store.append("a", "txn", txn("Buy", "AAPL", 1, 100.0)) for _ in range(4)]
+    assert snapshot_row(store, "a") == (ids[2],)
+
+    reader = AccountStore(path)
+    state = reader.load("a")
+    assert state["portfolio"] == {"AAPL": 4}
+    # Only the event after the snapshot was replayed
+    assert reader._since_snapshot["a"] == 1
+
+
+def test_snapshot_keeps_events_from_other_sessions(path):
+    first = AccountStore(path, snapshot_every=2)
+    second = AccountStore(path, snapshot_every=2)
+    first.load("a")
+    second.load("a")
+    first.append("a", "txn", txn("Buy", "AAPL", 1, 100.0))
+    second.append("a", "txn", txn("Buy", "MSFT", 1, 300.0))
+    # first's second append snapshots, folding second's event from the journal
+    first.append("a", "txn", txn("Buy", "AAPL", 1, 100.0))
+
+    state = AccountStore(path).load("a")
+    assert state["portfolio"] == {"AAPL": 2, "MSFT": 1}
+
+
+def test_older_snapshot_never_replaces_a_newer_one(path):
+    store = AccountStore(path)
+    ids = [store.append("a", "txn", txn("Buy", "AAPL", 1, 100.0)) for _ in range(3)]
+    store.snapshot("a")
+    store.snapshot("a", ids[0])
+    assert snapshot_row(store, "a") == (ids[2],)
+    assert AccountStore(path).load("a")["portfolio"] == {"AAPL": 3}
+
+
+def test_import_state_replaces_the_account(path):
+    store = AccountStore(path)
+    store.append("a", "txn", txn("Buy", "AAPL", 5, 100.0))
+    state = new_state()
+    apply_event(state, "txn", txn("Buy", "KO", 2, 50.0))
+    store.import_state("a", state)
+    store.append("a", "txn", txn("Buy", "KO", 1, 50.0))
+
+    loaded = AccountStore(path).load("a")
+    assert loaded["portfolio"] == {"KO": 3}
+    assert loaded["cash_balance"] == pytest.approx(STARTING_CASH - 150)
+
+
+def test_accounts_are_separate(path):
+    store = AccountStore(path)
+    store.append("a", "txn", txn("Buy", "AAPL", 1, 100.0))
+    store.append("b", "txn", txn("Buy", "MSFT", 1, 300.0))
+    reader = AccountStore(path)
+    assert reader.load("a")["portfolio"] == {"AAPL": 1}
+    assert reader.load("b")["portfolio"] == {"MSFT": 1}
@@ -0,0 +1,77 @@
+# tests/test_text_normalize.py
+import random
+import re
+
+import pytest
+
+from text_normalize import clean_user_input, display_text, sanitize_response
+
+
+# The re.sub chains text_normalize replaced; its fused scans must give
+# exactly the same result
+def old_sanitize_response(text):
+    text = re.sub(r"`+", "", text)
+    text = re.sub(r"_([^_]+)_", r"\1", text)
+    text = re.sub(r"([a-zA-Z])(\d)", r"\1 \2", text)
+    text = re.sub(r"(\d)([a-zA-Z])", r"\1 \2", text)
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r"(?<=[a-zA-Z])(?=[A-Z])", " ", text)
+    return text
+
+
+def old_clean_user_input(text):
+    text = re.sub(r"(\d),\s*(\d)", r"\1\2", text)
+    text = re.sub(r"nowversus", "now versus ", text)
+    text = re.sub(r"(\d)([a-zA-Z])", r"\1 \2", text)
+    text = re.sub(r"([a-zA-Z])(\d)", r"\1 \2", text)
+    return text
+
+
+# Short tokens that hit every rule and their overlaps, including Unicode
+# digits and spacing that \d and \s match
+TOKENS = [
+    "a", "Z", "x", "7", "0", "١", "²", ",", ", ", " ,", "  ", "\t", "\n", " ",
+    "_", "__", "`", "``", "now", "versus", "nowversus", "NowVersus", "1, 000", "$",
+    "%", ".", "é", "ß", "A1b", "1B", "iPhone",
+]
+CASES = [
+    "",
+    "I invest $200 a month for 10years at 7%",
+    "What if I put 1, 000 nowversus 500 later?",
+    "Returns of `12%` over _five_ years, compounding monthlyWith fees",
+    "nowversus100",
+    "1,2,3 , 4 ,5",
+]
+
+
+def random_texts(count, seed=20):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 16)))
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_sanitize_response_matches_old_chain_on_examples(text):
+    assert sanitize_response(text) == old_sanitize_response(text)
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_clean_user_input_matches_old_chain_on_examples(text):
+    assert clean_user_input(text) == old_clean_user_input(text)
+
+
+def test_sanitize_response_matches_old_chain_on_random_text():
+    for text in random_texts(20000):
+        assert sanitize_response(text) == old_sanitize_response(text), text
+
+
+def test_clean_user_input_matches_old_chain_on_random_text():
+    for text in random_texts(20000, seed=21):
+        assert clean_user_input(text) == old_clean_user_input(text), text
+
+
+def test_display_text_sanitizes_once():
+    message = {"role": "assistant", "content": "Put _200_ in10 funds"}
+    assert display_text(message) == old_sanitize_response(message["content"])
+    message["content"] = "changed"
+    assert display_text(message) == "Put 200 in 10 funds"
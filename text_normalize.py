@@ -0,0 +1,50 @@
+# text_normalize.py
+import re
+
+# Chat text clean-up with precompiled patterns. Each function gives exactly
+# the same result as the chain of re.sub passes it replaces, but the
+# independent passes are fused into one scan.
+
+_EMPHASIS = re.compile(r"_([^_]+)_")
+# One scan for: comma spacing, letter|digit, digit|letter, letter|Capital.
+# Inserting spaces never creates or removes one of these boundaries, so
+# doing them together matches doing them one after another.
+_RESPONSE_SPACING = re.compile(r"\s*,\s*|(?<=[a-zA-Z])(?=[\dA-Z])|(?<=\d)(?=[a-zA-Z])")
+
+# One scan for: letter|digit and digit|letter boundaries, thousands
+# separators ("1, 000" -> "1000") and the merged word "nowversus". The
+# boundaries come first so one right before a number is still spaced. The
+# space added after "nowversus" already separates it from a digit.
+_INPUT_FIXES = re.compile(
+    r"(?<=[a-zA-Z])(?<!nowversus)(?=\d)|(?<=\d)(?=[a-zA-Z])|(\d),\s*(\d)|nowversus"
+)
+
+
+def _space_response(match):
+    return ", " if match.group() else " "
+
+
+def _fix_input(match):
+    if match.group(1):
+        return match.group(1) + match.group(2)
+    if match.group():
+        return "now versus "
+    return " "
+
+
+def sanitize_response(text):
+    text = text.replace("`", "")
+    text = _EMPHASIS.sub(r"\1", text)
+    return _RESPONSE_SPACING.sub(_space_response, text)
+
+
+def clean_user_input(text):
+    return _INPUT_FIXES.sub(_fix_input, text)
+
+
+def display_text(message):
+    # The sanitized form is stored on the message the first time it is
+    # shown, so reruns only sanitize messages that are new
+    if "display" not in message:
+        message["display"] = sanitize_response(message["content"])
+    return message["display"]
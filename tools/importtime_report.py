@@ -0,0 +1,83 @@
+# tools/importtime_report.py
+# Import-time budget for the app's cold start:
+#   python tools/importtime_report.py [--repeat 3] [--budget-ms 1500]
+# For each page, the module-level imports are run in a fresh interpreter
+# under -X importtime (the page itself isn't executed, so nothing touches
+# the network). The report lists the total and the heaviest top-level
+# imports. It exits 1 if a page goes over the budget, or if a library that
+# should only load on first use (yfinance, openai, finnhub, feedparser, lxml)
+# is imported eagerly, so it can run as a check before deploy.
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["mock_investment_account.py", "pages/asset_dashboard.py", "pages/what_if_simulator.py"]
+DEFERRED = ("yfinance", "openai", "finnhub", "feedparser", "lxml")
+# Per page, on top of DEFERRED: the main page only draws charts inside
+# expanders, so Plotly Express must not load with it either
+PAGE_DEFERRED = {"mock_investment_account.py": ("plotly.express",)}
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1500))
+
+
+def page_imports(path):
+    with open(os.path.join(ROOT, path)) as f:
+        source = f.read()
+    nodes = ast.parse(source).body
+    return "\n".join(ast.get_source_segment(source, node) for node in nodes if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_times(code):
+    # {module: (self_us, cumulative_us, depth)} in import order
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One space after the bar, then two per level of nesting
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def measure(page, repeat):
+    # Best of `repeat` runs, to keep disk cache noise out of the numbers
+    code = page_imports(page)
+    runs = [import_times(code) for _ in range(repeat)]
+    best = min(runs, key=lambda times: sum(c for _, c, depth in times.values() if depth == 0))
+    top = {name: c for name, (_, c, depth) in best.items() if depth == 0}
+    deferred = DEFERRED + PAGE_DEFERRED.get(page, ())
+    eager = [name for name in deferred if name in best]
+    return sum(top.values()) / 1000, top, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per page against a budget")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=8, help="heaviest imports to list per page")
+    args = parser.parse_args()
+
+    failed = False
+    for page in PAGES:
+        total_ms, top, eager = measure(page, args.repeat)
+        status = "ok" if total_ms <= args.budget_ms and not eager else "FAIL"
+        failed |= status == "FAIL"
+        print(f"{page}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms) {status}")
+        for name, cumulative_us in sorted(top.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        if eager:
+            print(f"  loaded eagerly: {', '.join(eager)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# tools/stub_news.py
+# Local stand-in for the Yahoo RSS and Finnhub news endpoints:
+#   python tools/stub_news.py --port 8002
+#   NEWS_RSS_URL="http://127.0.0.1:8002/rss/headline?s={symbol}" \
+#   FINNHUB_API_URL=http://127.0.0.1:8002/api/v1 streamlit run mock_investment_account.py
+# RSS responses carry an ETag and Last-Modified and answer conditional
+# requests with 304. /api/v1/news honours minId. A new article is
+# published every --every seconds, and each request is logged with its
+# status so the effect of the caching is visible.
+import argparse
+import hashlib
+import json
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STARTED = time.time()
+
+
+def articles(every):
+    # Article n is published at STARTED + n * every; ids start at 1
+    count = int((time.time() - STARTED) // every) + 1
+    return [
+        {"id": n, "published": int(STARTED + (n - 1) * every), "headline": f"Stub headline {n}",
+         "summary": f"Summary of stub article {n}."}
+        for n in range(max(1, count - 20), count + 1)
+    ]
+
+
+def rss(symbol, items):
+    entries = "".join(
+        f"<item><guid>{symbol}-{a['id']}</guid><title>{symbol}: {a['headline']}</title>"
+        f"<link>https://example.com/{symbol}/{a['id']}</link><description>{a['summary']}</description>"
+        f"<pubDate>{formatdate(a['published'], usegmt=True)}</pubDate></item>"
+        for a in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{symbol}</title>{entries}</channel></rss>'
+
+
+class Handler(BaseHTTPRequestHandler):
+    every = 60.0
+
+    def _send(self, status, body=b"", content_type="text/plain", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        print(f"{status} {self.path}", flush=True)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        items = articles(self.every)
+
+        if url.path.endswith("/rss/headline"):
+            symbol = query.get("s", ["AAPL"])[0]
+            body = rss(symbol, items).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            modified = formatdate(items[-1]["published"], usegmt=True)
+            if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == modified:
+                self._send(304, headers={"ETag": etag, "Last-Modified": modified})
+            else:
+                self._send(200, body, "application/rss+xml", {"ETag": etag, "Last-Modified": modified})
+        elif url.path.endswith("/news"):
+            min_id = int(query.get("minId", ["0"])[0])
+            news = [
+                {"id": a["id"], "datetime": a["published"], "headline": a["headline"],
+                 "summary": a["summary"], "url": f"https://example.com/news/{a['id']}"}
+                for a in reversed(items) if a["id"] > min_id
+            ]
+            self._send(200, json.dumps(news).encode(), "application/json")
+        else:
+            self._send(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Yahoo RSS and Finnhub news server")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--every", type=float, default=60, help="seconds between new articles")
+    args = parser.parse_args()
+    Handler.every = args.every
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Stub news on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
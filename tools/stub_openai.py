@@ -0,0 +1,82 @@
+# tools/stub_openai.py
+# A tiny OpenAI-compatible server for running ZenBot offline:
+#   python tools/stub_openai.py --port 8001
+#   OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=stub streamlit run mock_investment_account.py
+# It answers /v1/chat/completions (streaming or not) with a canned reply
+# that echoes the question, and logs how many messages each request sent.
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def reply_for(messages):
+    question = messages[-1]["content"] if messages else ""
+    return (
+        f"This is a stub answer to: {question} "
+        "Investing 200 per month for 10 years at 7 percent grows to about 34,600. "
+        "This is for education only."
+    )
+
+
+class Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        print(f"chat request: {len(messages)} messages, stream={body.get('stream', False)}", flush=True)
+        text = reply_for(messages)
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body.get("model", "stub")}
+
+        if not body.get("stream"):
+            payload = json.dumps({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            delta = {"content": word + (" " if i < len(words) - 1 else "")}
+            if i == 0:
+                delta["role"] = "assistant"
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.delay)
+        done = {**base, "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible chat API")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds between streamed words")
+    args = parser.parse_args()
+    Handler.delay = args.delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Stub OpenAI API on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# trending_service.py
+import os
+
+from market_cache import cache
+from upstream import get_upstream
+
+# Yahoo's trending tickers, scraped once per TRENDING_TTL_SECONDS for the
+# whole process over the pooled Yahoo upstream. Only the symbol column of
+# the first table is read, straight from lxml's parse tree.
+TRENDING_URL = os.getenv("TRENDING_URL", "https://finance.yahoo.com/trending-tickers")
+TRENDING_TTL_SECONDS = 300
+FETCH_TIMEOUT_SECONDS = 5
+
+
+def parse_trending(html):
+    import lxml.html
+
+    table = lxml.html.fromstring(html).find(".//table")
+    if table is None:
+        return []
+    headers = [cell.text_content().strip() for cell in table.iterfind(".//thead//th")]
+    column = headers.index("Symbol") if "Symbol" in headers else 0
+    symbols = []
+    for row in table.iterfind(".//tbody/tr"):
+        cells = row.findall("td")
+        if len(cells) > column:
+            symbol = cells[column].text_content().strip()
+            if symbol:
+                symbols.append(symbol)
+    return symbols
+
+
+def fetch_trending():
+    response = get_upstream("yahoo").get(TRENDING_URL, key="trending", timeout=FETCH_TIMEOUT_SECONDS)
+    return parse_trending(response.content)
+
+
+def get_trending_symbols(limit=5):
+    # Failures aren't cached, so the next page view tries again
+    try:
+        return cache.get_or_fetch(("trending",), fetch_trending, ttl=TRENDING_TTL_SECONDS)[:limit]
+    except Exception:
+        return []
@@ -0,0 +1,237 @@
+# upstream.py
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Every call to an external service (Yahoo, Finnhub, OpenAI) goes through
+# the Upstream for its host:
+#   - a token bucket caps the request rate per host
+#   - timeouts and retryable failures (connection errors, 429, 5xx) are
+#     retried with jittered exponential backoff, within a total deadline
+#   - after FAILURE_THRESHOLD failures in a row the circuit opens and calls
+#     fail fast for RESET_SECONDS, so a hung host can't tie up every
+#     Streamlit worker thread
+#   - a call made with a key remembers its last good result and returns it
+#     when the upstream is failing
+# HTTP calls share one keep-alive connection pool per host.
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", 10))
+RETRIES = 2
+BACKOFF_SECONDS = 0.5
+FAILURE_THRESHOLD = 5
+RESET_SECONDS = 30
+POOL_SIZE = 16
+LAST_GOOD_ENTRIES = 512
+# Per-key backoff after a failed refresh, doubling with each failure in a row
+FAILURE_BACKOFF_SECONDS = 60
+MAX_FAILURE_BACKOFF_SECONDS = 3600
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpen(UpstreamError):
+    pass
+
+
+class RateLimited(UpstreamError):
+    pass
+
+
+class NoData(UpstreamError):
+    # An empty answer from an API that reports failures that way: yf.download
+    # swallows per-ticker errors (rate limits included) and returns nothing
+    pass
+
+
+class NotListed(UpstreamError):
+    # The host answered, it just has nothing for these symbols (rights,
+    # units, warrants, delisted tickers). Not retried, and not a host failure.
+    def __init__(self, message, symbols=()):
+        super().__init__(message)
+        self.symbols = list(symbols)
+
+
+# yfinance errors that retrying won't fix, matched by name (like all of
+# yfinance's exceptions) so this module doesn't have to import yfinance
+PERMANENT_YF_ERRORS = {"YFTickerMissingError", "YFInvalidPeriodError", "YFNotImplementedError"}
+
+
+def is_retryable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError, ConnectionError, NoData)):
+        return True
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if "YFException" in names:
+        return not names & PERMANENT_YF_ERRORS
+    # requests, finnhub and openai errors all carry the HTTP status somewhere
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    return status in RETRY_STATUSES
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                raise RateLimited("Rate limit wait exceeds the timeout")
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        # Once reset_seconds have passed, one trial call is let through
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class Backoff:
+    # For callers that keep their own copy of the data (fundamentals, news):
+    # a key whose refresh failed isn't tried again until its backoff has
+    # passed, so one bad symbol doesn't cost an upstream call on every rerun
+    def __init__(self, base_seconds=FAILURE_BACKOFF_SECONDS, max_seconds=MAX_FAILURE_BACKOFF_SECONDS):
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        # key -> (time of the last failure, failures in a row)
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def remaining(self, key):
+        with self._lock:
+            failure = self._failures.get(key)
+        if failure is None:
+            return 0
+        failed_at, count = failure
+        backoff = min(self.base_seconds * 2 ** (count - 1), self.max_seconds)
+        return max(0, failed_at + backoff - time.time())
+
+    def record_failure(self, key):
+        with self._lock:
+            _, count = self._failures.get(key, (0, 0))
+            self._failures[key] = (time.time(), count + 1)
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class Upstream:
+    def __init__(self, name, rate, burst, timeout=DEFAULT_TIMEOUT_SECONDS, retries=RETRIES, headers=None):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._last_good[key] = value
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > LAST_GOOD_ENTRIES:
+                self._last_good.popitem(last=False)
+
+    def _fallback(self, key, error):
+        with self._lock:
+            if key is not None and key in self._last_good:
+                return self._last_good[key]
+        raise error
+
+    def call(self, fn, *args, key=None, **kwargs):
+        if not self.breaker.allow():
+            return self._fallback(key, CircuitOpen(f"{self.name} is unavailable, retrying in {RESET_SECONDS}s"))
+        deadline = time.monotonic() + self.timeout * (self.retries + 1)
+        attempt = 0
+        while True:
+            try:
+                self.bucket.acquire(max(0, deadline - time.monotonic()))
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+                if attempt < self.retries and is_retryable(e) and time.monotonic() + delay < deadline:
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                # Waiting on our own token bucket says nothing about the host
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                return self._fallback(key, e)
+            self.breaker.record_success()
+            if key is not None:
+                self._remember(key, result)
+            return result
+
+    def get(self, url, key=None, **kwargs):
+        # Pooled GET; HTTP errors raise so they count as failures
+        timeout = kwargs.pop("timeout", self.timeout)
+
+        def fetch():
+            response = self.session.get(url, timeout=timeout, **kwargs)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+        return self.call(fetch, key=key)
+
+
+UPSTREAMS = {
+    "yahoo": Upstream("yahoo", rate=5, burst=10, headers={"User-Agent": "Mozilla/5.0"}),
+    "finnhub": Upstream("finnhub", rate=1, burst=5),
+    "openai": Upstream("openai", rate=2, burst=5, timeout=30, retries=1),
+}
+
+
+def get_upstream(name):
+    return UPSTREAMS[name]
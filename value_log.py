@@ -0,0 +1,168 @@
+# value_log.py
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Portfolio value history in three fixed-size tiers, so memory and chart
+# cost stay bounded however long a session runs:
+#   raw points for the last day, 15 minute buckets for the last 30 days,
+#   daily buckets after that (about 10 years).
+RAW_CAPACITY = 4096
+RAW_SPAN = 24 * 3600
+QUARTER_SECONDS = 15 * 60
+QUARTER_CAPACITY = 30 * 96
+QUARTER_SPAN = 30 * 24 * 3600
+DAY_SECONDS = 24 * 3600
+DAY_CAPACITY = 3650
+CHART_POINTS = 500
+
+
+def to_timestamp(moment):
+    # Naive local datetimes are stored as if they were UTC, so buckets line
+    # up with local midnight and charts show local wall-clock time
+    return int(moment.replace(tzinfo=timezone.utc).timestamp())
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, value):
+        end = (self.start + self.size) % self.capacity
+        self.timestamps[end] = timestamp
+        self.values[end] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def last_index(self):
+        return (self.start + self.size - 1) % self.capacity
+
+    def arrays(self):
+        order = (self.start + np.arange(self.size)) % self.capacity
+        return self.timestamps[order], self.values[order]
+
+
+class ValueLog:
+    def __init__(self):
+        self.raw = RingBuffer(RAW_CAPACITY)
+        self.quarter = RingBuffer(QUARTER_CAPACITY)
+        self.daily = RingBuffer(DAY_CAPACITY)
+
+    def __len__(self):
+        return len(self.raw) or len(self.quarter) or len(self.daily)
+
+    def add(self, timestamp, value):
+        timestamp = int(timestamp)
+        self.raw.append(timestamp, value)
+        # Each bucket keeps the last value seen in it
+        for tier, width in ((self.quarter, QUARTER_SECONDS), (self.daily, DAY_SECONDS)):
+            bucket = timestamp - timestamp % width
+            if len(tier) and tier.timestamps[tier.last_index()] == bucket:
+                tier.values[tier.last_index()] = value
+            else:
+                tier.append(bucket, value)
+
+    def append(self, point):
+        self.add(to_timestamp(datetime.fromisoformat(str(point["date"]))), point["value"])
+
+    def last_timestamp(self):
+        if not len(self.raw):
+            return None
+        return int(self.raw.timestamps[self.raw.last_index()])
+
+    def last_value(self):
+        if not len(self.raw):
+            return None
+        return float(self.raw.values[self.raw.last_index()])
+
+    def series(self):
+        last = self.last_timestamp()
+        if last is None:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+        raw_cutoff = last - RAW_SPAN
+        quarter_cutoff = last - QUARTER_SPAN
+        raw_ts, raw_values = self.raw.arrays()
+        q_ts, q_values = self.quarter.arrays()
+        d_ts, d_values = self.daily.arrays()
+        # Use the finest tier available for each time range
+        raw_keep = raw_ts >= raw_cutoff
+        raw_start = raw_ts[raw_keep][0] if raw_keep.any() else last
+        q_keep = (q_ts >= quarter_cutoff) & (q_ts < raw_start)
+        q_start = q_ts[q_keep][0] if q_keep.any() else raw_start
+        d_keep = d_ts < q_start
+        return (
+            np.concatenate([d_ts[d_keep], q_ts[q_keep], raw_ts[raw_keep]]),
+            np.concatenate([d_values[d_keep], q_values[q_keep], raw_values[raw_keep]]),
+        )
+
+    def chart_frame(self, max_points=CHART_POINTS):
+        timestamps, values = lttb(*self.series(), max_points)
+        return pd.DataFrame({
+            "date": pd.to_datetime(timestamps, unit="s"),
+            "value": values,
+        })
+
+    def to_dict(self):
+        return {
+            name: {
+                "timestamps": tier.arrays()[0].tolist(),
+                "values": tier.arrays()[1].tolist(),
+            }
+            for name, tier in (("raw", self.raw), ("quarter", self.quarter), ("daily", self.daily))
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        log = cls()
+        for name in ("raw", "quarter", "daily"):
+            tier = getattr(log, name)
+            for timestamp, value in zip(data[name]["timestamps"], data[name]["values"]):
+                tier.append(timestamp, value)
+        return log
+
+    @classmethod
+    def from_points(cls, points):
+        log = cls()
+        for point in points:
+            log.append(point)
+        return log
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets downsampling: keeps the first and last
+    # points and, per bucket, the point forming the largest triangle with
+    # the previously kept point and the next bucket's average.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    xf = x.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs(
+            (xf[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (xf[previous] - xf[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
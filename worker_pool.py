@@ -0,0 +1,24 @@
+# worker_pool.py
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pools for CPU-bound work (Monte Carlo chunks, backtest sweeps),
+# one per caller, created on first use. Workers are never forked from the
+# Streamlit server: it runs other threads (price scheduler, sidebar pool)
+# and holds SQLite connections, and a fork copies any lock they hold in
+# whatever state it is in. forkserver (or spawn where that's missing)
+# starts them from a clean process instead.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool(name, workers):
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            context = multiprocessing.get_context(START_METHOD)
+            pool = _pools[name] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return pool